@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Atlas des PP (pp/*.png) et planche des cartes participants
+
+Rendus Python
+    Les PP sont décodées une fois, réduites en carrés de ATLAS_TILE px et
+    rangées dans un seul fichier de pixels RGBA bruts (comme template_cache) :
+
+        pp-atlas.rgba : en-tête (24 octets) magic | largeur | hauteur | tuile
+                        puis largeur * hauteur * 4 octets RGBA
+        pp-atlas.json : {"tile": 256, "entries": {"aikyuuu.png":
+                         {"box": [x, y, w, h], "mtime_ns": ..., "size": ...}}}
+
+    avatar_cache lit l'atlas par mmap et découpe la tuile voulue au lieu
+    d'ouvrir et décoder le PNG d'origine (jusqu'à 2000 px de côté). Une PP
+    modifiée, absente de l'atlas ou plus petite que le rond demandé est lue
+    depuis son fichier, comme avant. ensure() (appelé par render_all)
+    reconstruit l'atlas seulement si une PP a changé.
+
+Pages web (--cards)
+    Les cartes de assets/Participants/cartes/*.png sont rangées dans une seule
+    planche cartes-atlas.webp, avec cartes-atlas.json (coordonnées) et
+    cartes-atlas.css (une classe .carte-<nom> par carte) : une requête au lieu
+    d'une trentaine pour participants.html.
+
+Exemples :
+    python avatar_atlas.py              # atlas des PP (si besoin)
+    python avatar_atlas.py --force      # atlas des PP, reconstruit
+    python avatar_atlas.py --cards      # planche des cartes participants
+"""
+
+import argparse
+import json
+import math
+import mmap
+import os
+import struct
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image
+
+import avatar_registry
+import encoders
+import profiling
+import template_cache
+
+PROG_DIR = Path(__file__).resolve().parent
+REPO_DIR = PROG_DIR.parents[2]
+
+# =================== CONFIG ===================
+
+AVATAR_ATLAS     = os.environ.get("AVATAR_ATLAS", "1") == "1"
+AVATAR_ATLAS_DIR = Path(os.environ.get("AVATAR_ATLAS_DIR", str(template_cache.TEMPLATE_CACHE_DIR)))
+PP_DIR           = avatar_registry.PP_DIR
+ATLAS_TILE       = int(os.environ.get("ATLAS_TILE", "256"))
+
+CARDS_DIR     = Path(os.environ.get("CARDS_DIR", str(REPO_DIR / "assets/Participants/cartes")))
+CARDS_QUALITY = int(os.environ.get("CARDS_QUALITY", "90"))
+
+# Largeur maximale d'une planche (px)
+ATLAS_MAX_WIDTH = 4096
+
+# =================================================
+
+MAGIC  = b"PPATLAS\x01"
+HEADER = struct.Struct("<8sIII")
+
+
+def atlas_paths():
+    return AVATAR_ATLAS_DIR / "pp-atlas.rgba", AVATAR_ATLAS_DIR / "pp-atlas.json"
+
+
+def sources(folder):
+    return sorted(p for p in Path(folder).glob("*.png") if p.is_file())
+
+
+def pack(sizes, max_width=ATLAS_MAX_WIDTH):
+    """Rangement en étagères : [(x, y)] pour chaque (w, h), et la taille de la planche."""
+    order = sorted(range(len(sizes)), key=lambda i: -sizes[i][1])
+    # Largeur visée : planche à peu près carrée, sans dépasser max_width
+    area = sum(w * h for w, h in sizes)
+    target = min(max_width, max(max(w for w, _ in sizes), int(math.ceil(math.sqrt(area)))))
+
+    places = [None] * len(sizes)
+    x = y = shelf = width = 0
+    for i in order:
+        w, h = sizes[i]
+        if x and x + w > target:
+            x, y = 0, y + shelf
+            shelf = 0
+        places[i] = (x, y)
+        x += w
+        shelf = max(shelf, h)
+        width = max(width, x)
+    return places, (width, y + shelf)
+
+
+def stamp(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+# =================== ATLAS DES PP ===================
+
+def load_index():
+    _, index_path = atlas_paths()
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_fresh(index, files):
+    if not index or index.get("tile") != ATLAS_TILE:
+        return False
+    entries = index.get("entries", {})
+    if set(entries) != {p.name for p in files}:
+        return False
+    for p in files:
+        e = entries[p.name]
+        if [e["mtime_ns"], e["size"]] != list(stamp(p)):
+            return False
+    return True
+
+
+def build(force=False):
+    """Construit pp-atlas.rgba / .json si une PP a changé. Retourne True si reconstruit."""
+    files = sources(PP_DIR)
+    if not files or (not force and is_fresh(load_index(), files)):
+        return False
+
+    tiles = []
+    for p in files:
+        profiling.count("avatars_decoded")
+        with Image.open(p) as f:
+            # Même déformation qu'avant (carré, sans garder les proportions)
+            tiles.append(f.convert("RGBA").resize((ATLAS_TILE, ATLAS_TILE), Image.LANCZOS))
+    places, size = pack([t.size for t in tiles])
+
+    sheet = Image.new("RGBA", size, (0, 0, 0, 0))
+    entries = {}
+    for p, tile, (x, y) in zip(files, tiles, places):
+        sheet.paste(tile, (x, y))
+        mtime_ns, nbytes = stamp(p)
+        entries[p.name] = {"box": [x, y, ATLAS_TILE, ATLAS_TILE], "mtime_ns": mtime_ns, "size": nbytes}
+
+    rgba_path, index_path = atlas_paths()
+    AVATAR_ATLAS_DIR.mkdir(parents=True, exist_ok=True)
+
+    def write_pixels(f):
+        f.write(HEADER.pack(MAGIC, size[0], size[1], ATLAS_TILE))
+        f.write(sheet.tobytes("raw", "RGBA"))
+
+    encoders.write_atomic(rgba_path, write_pixels)
+    data = json.dumps({"tile": ATLAS_TILE, "size": list(size), "entries": entries}, indent=1) + "\n"
+    encoders.write_atomic(index_path, lambda f: f.write(data.encode("utf-8")))
+    print(f"🧩 Atlas des PP : {len(files)} PP, {size[0]}x{size[1]} px -> {rgba_path}")
+    return True
+
+
+def ensure():
+    """Atlas à jour avant un rendu (rien à faire si aucune PP n'a changé)."""
+    if not AVATAR_ATLAS:
+        return
+    with profiling.stage("atlas"):
+        try:
+            build()
+        except OSError as e:
+            print("⚠️ Atlas des PP non écrit :", e)
+
+
+@lru_cache(maxsize=4)
+def _atlas(path, mtime_ns, size):
+    """(image RGBA sur le mmap, index) ; une nouvelle version de l'atlas = une nouvelle clé."""
+    index = load_index()
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, w, h, _ = HEADER.unpack(mm[:HEADER.size])
+    if magic != MAGIC or len(mm) != HEADER.size + w * h * 4 or not index:
+        return None
+    im = Image.frombuffer("RGBA", (w, h), memoryview(mm)[HEADER.size:], "raw", "RGBA", 0, 1)
+    return im, index
+
+
+def tile(pp_file, min_size=0):
+    """Tuile RGBA de la PP depuis l'atlas, ou None (pas dans l'atlas, modifiée, trop petite)."""
+    if not AVATAR_ATLAS or min_size > ATLAS_TILE:
+        return None
+    pp_file = Path(pp_file)
+    if pp_file.resolve().parent != PP_DIR.resolve():
+        return None
+    rgba_path, _ = atlas_paths()
+    try:
+        atlas = _atlas(str(rgba_path), *stamp(rgba_path))
+    except (OSError, ValueError, struct.error):
+        return None
+    if atlas is None:
+        return None
+    im, index = atlas
+    entry = index.get("entries", {}).get(pp_file.name)
+    if entry is None or [entry["mtime_ns"], entry["size"]] != list(stamp(pp_file)):
+        return None
+    x, y, w, h = entry["box"]
+    return im.crop((x, y, x + w, y + h))
+
+
+def clear():
+    _atlas.cache_clear()
+
+
+# =================== PLANCHE DES CARTES ===================
+
+def build_cards(out_dir=None):
+    """cartes-atlas.webp / .json / .css à partir de CARDS_DIR/*.png."""
+    files = sources(CARDS_DIR)
+    if not files:
+        raise SystemExit(f"❌ Aucune carte dans {CARDS_DIR}")
+    out_dir = Path(out_dir) if out_dir else CARDS_DIR.parent
+
+    cards = []
+    for p in files:
+        with Image.open(p) as f:
+            cards.append(f.convert("RGBA"))
+    places, size = pack([c.size for c in cards])
+
+    sheet = Image.new("RGBA", size, (0, 0, 0, 0))
+    entries = {}
+    css = [
+        "/* Généré par assets/Classement/Prog/avatar_atlas.py --cards */",
+        ".participant-card.carte{background-image:url(cartes-atlas.webp);background-repeat:no-repeat}",
+    ]
+    for p, card, (x, y) in zip(files, cards, places):
+        sheet.paste(card, (x, y))
+        w, h = card.size
+        entries[p.stem] = [x, y, w, h]
+        css.append(f".participant-card.carte-{p.stem}{{width:{w}px;height:{h}px;"
+                   f"background-position:{-x}px {-y}px}}")
+
+    webp = out_dir / "cartes-atlas.webp"
+    encoders.write_atomic(webp, lambda f: sheet.save(f, format="WEBP", quality=CARDS_QUALITY,
+                                                     method=encoders.WEBP_METHOD))
+    index = json.dumps({"image": webp.name, "size": list(size), "cards": entries}, indent=1) + "\n"
+    encoders.write_atomic(out_dir / "cartes-atlas.json", lambda f: f.write(index.encode("utf-8")))
+    style = "\n".join(css) + "\n"
+    encoders.write_atomic(out_dir / "cartes-atlas.css", lambda f: f.write(style.encode("utf-8")))
+    print(f"🧩 Planche des cartes : {len(files)} cartes, {size[0]}x{size[1]} px, "
+          f"{webp.stat().st_size / 1024:.0f} Ko -> {webp}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Atlas des PP et planche des cartes participants")
+    parser.add_argument("--force", action="store_true", help="reconstruit l'atlas même s'il est à jour")
+    parser.add_argument("--cards", action="store_true", help="planche des cartes participants (pages web)")
+    args = parser.parse_args()
+
+    if args.cards:
+        build_cards()
+        return
+    if not build(force=args.force):
+        print("✅ Atlas des PP déjà à jour :", atlas_paths()[0])
+
+
+if __name__ == "__main__":
+    main()
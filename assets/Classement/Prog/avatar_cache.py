@@ -0,0 +1,105 @@
+"""
+Cache des PP rondes (pp/*.png)
+
+Chaque avatar est décodé, redimensionné et masqué en cercle une seule fois par
+(fichier, mtime, diamètre). Le résultat est une image RGBA dont l'alpha est le
+masque circulaire : il suffit de faire im.paste(avatar, xy, avatar).
+
+Les PP sont lues dans l'atlas (avatar_atlas, tuiles déjà réduites, par mmap)
+plutôt que décodées depuis leur PNG d'origine ; repli sur le fichier sinon.
+
+Le bord du cercle est anti-crénelé : le masque est dessiné AVATAR_SUPERSAMPLE
+fois plus grand puis réduit (moyenne des pixels), une fois par diamètre.
+AVATAR_SUPERSAMPLE=1 redonne le bord net d'avant.
+
+Si AVATAR_CACHE_DIR est défini, les ronds préparés sont aussi enregistrés sur
+disque et relus aux exécutions suivantes.
+"""
+
+import hashlib
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+import avatar_atlas
+import profiling
+
+AVATAR_CACHE_SIZE = int(os.environ.get("AVATAR_CACHE_SIZE", "256"))
+AVATAR_CACHE_DIR  = os.environ.get("AVATAR_CACHE_DIR", "")
+AVATAR_SUPERSAMPLE = max(1, int(os.environ.get("AVATAR_SUPERSAMPLE", "4")))
+
+
+@lru_cache(maxsize=None)
+def circle_mask(diameter):
+    """Masque "L" circulaire, construit une fois par diamètre."""
+    if AVATAR_SUPERSAMPLE == 1:
+        mask = Image.new("L", (diameter, diameter), 0)
+        ImageDraw.Draw(mask).ellipse((0, 0, diameter, diameter), fill=255)
+        return mask
+    size = diameter * AVATAR_SUPERSAMPLE
+    mask = Image.new("L", (size, size), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, size - 1, size - 1), fill=255)
+    return mask.reduce(AVATAR_SUPERSAMPLE)
+
+
+def _disk_path(path, mtime_ns, diameter):
+    key = hashlib.sha1(f"{path}|{mtime_ns}|{diameter}|{AVATAR_SUPERSAMPLE}".encode("utf-8")).hexdigest()[:12]
+    return Path(AVATAR_CACHE_DIR) / f"{Path(path).stem}_{diameter}_{key}.png"
+
+
+def _prepare(path, diameter):
+    pp_im = avatar_atlas.tile(path, diameter)
+    if pp_im is not None:
+        profiling.count("avatars_from_atlas")
+    else:
+        profiling.count("avatars_decoded")
+        pp_im = Image.open(path).convert("RGBA")
+    pp_im = pp_im.resize((diameter, diameter))
+    # L'alpha d'origine est ignoré, comme avec l'ancien paste(pp_im, xy, mask)
+    pp_im.putalpha(circle_mask(diameter))
+    return pp_im
+
+
+@lru_cache(maxsize=AVATAR_CACHE_SIZE)
+def _prepared(path, mtime_ns, diameter):
+    if not AVATAR_CACHE_DIR:
+        return _prepare(path, diameter)
+
+    cached = _disk_path(path, mtime_ns, diameter)
+    if cached.exists():
+        try:
+            with Image.open(cached) as f:
+                return f.convert("RGBA")
+        except Exception:
+            pass
+
+    avatar = _prepare(path, diameter)
+    try:
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cached.with_suffix(".tmp")
+        avatar.save(tmp, format="PNG")
+        os.replace(tmp, cached)
+    except OSError:
+        pass
+    return avatar
+
+
+def load_avatar(pp_file, diameter):
+    """Rond RGBA prêt à coller, ou None si le fichier n'existe pas."""
+    try:
+        st = os.stat(pp_file)
+    except OSError:
+        return None
+    return _prepared(os.path.abspath(pp_file), st.st_mtime_ns, diameter)
+
+
+def cache_info():
+    return _prepared.cache_info()
+
+
+def clear():
+    _prepared.cache_clear()
+    circle_mask.cache_clear()
+    avatar_atlas.clear()
@@ -0,0 +1,168 @@
+"""
+Registre des PP : pseudo -> fichier de pp/, sans table à maintenir
+
+Le dossier pp/ est lu d'un seul scandir par passage ; chaque PP est indexée
+sous son nom de fichier normalisé (minuscules, sans accents ni ponctuation) :
+
+    "Gourmandise_", "gourmandise", "Gourmandisé"  ->  pp/gourmandise.png
+
+Les pseudos qu'on ne peut pas déduire du nom de fichier sont listés dans
+pp/aliases.json ({"pseudo": "fichier.png"}), normalisés de la même façon.
+
+L'index (mtime, taille et sha256 de chaque PP) est gardé dans AVATAR_INDEX,
+par défaut dans .sheet-cache (le dossier que la CI garde d'un run à l'autre) :
+aux exécutions suivantes seules les PP modifiées sont relues pour leur
+empreinte. Les recherches par ligne sont de simples accès à un dict : aucun
+accès disque pendant le rendu, et les chemins sont absolus (le script peut
+être lancé de n'importe quel dossier).
+
+Ajouter un joueur = déposer sa PP dans pp/ (et un alias si besoin).
+"""
+
+import hashlib
+import json
+import os
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+
+import profiling
+import sheet_revision
+
+PROG_DIR = Path(__file__).resolve().parent
+
+# =================== CONFIG ===================
+
+PP_DIR       = Path(os.environ.get("PP_DIR", str(PROG_DIR / "pp")))
+PP_ALIASES   = Path(os.environ.get("PP_ALIASES", str(PP_DIR / "aliases.json")))
+AVATAR_INDEX = Path(os.environ.get("AVATAR_INDEX", str(sheet_revision.SHEET_CACHE_DIR / "pp-index.json")))
+
+# =================================================
+
+
+def normalize(name):
+    """Clé de recherche : minuscules, sans accents, lettres et chiffres seulement."""
+    text = unicodedata.normalize("NFKD", str(name or ""))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return "".join(c for c in text.casefold() if c.isalnum())
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _stamps():
+    """((nom, mtime_ns, taille), ...) des PP, triés ; un seul scandir."""
+    try:
+        with os.scandir(PP_DIR) as it:
+            entries = [e for e in it if e.name.lower().endswith(".png") and e.is_file()]
+            stats = [(e.name, e.stat()) for e in entries]
+    except OSError:
+        return ()
+    return tuple(sorted((name, st.st_mtime_ns, st.st_size) for name, st in stats))
+
+
+def _aliases_stamp():
+    try:
+        st = os.stat(PP_ALIASES)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _load_index():
+    try:
+        with open(AVATAR_INDEX, encoding="utf-8") as f:
+            return json.load(f).get("files", {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def _save_index(files):
+    data = json.dumps({"dir": str(PP_DIR), "files": files}, indent=1, ensure_ascii=False) + "\n"
+    try:
+        AVATAR_INDEX.parent.mkdir(parents=True, exist_ok=True)
+        tmp = AVATAR_INDEX.with_name(AVATAR_INDEX.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, AVATAR_INDEX)
+    except OSError as e:
+        print("⚠️ Index des PP non écrit :", e)
+
+
+def _load_aliases():
+    try:
+        with open(PP_ALIASES, encoding="utf-8") as f:
+            aliases = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Alias des PP illisibles ({PP_ALIASES}) :", e)
+        return {}
+    return {normalize(k): v for k, v in aliases.items()}
+
+
+class Registry:
+    """Index pseudo normalisé -> chemin absolu de la PP ; s'utilise comme un dict (get)."""
+
+    def __init__(self, files, aliases):
+        self.files = files
+        self.aliases = aliases
+        self.index = {}
+        for name in sorted(files):
+            key = normalize(Path(name).stem)
+            if key in self.index:
+                print(f"⚠️ PP en double pour \"{key}\" : {name} ignoré")
+                continue
+            self.index[key] = str(PP_DIR / name)
+        for key, name in aliases.items():
+            if name in files:
+                self.index[key] = str(PP_DIR / name)
+            else:
+                print(f"⚠️ Alias \"{key}\" : {name} absent de {PP_DIR}")
+
+    def get(self, pseudo, default=None):
+        return self.index.get(normalize(pseudo), default)
+
+    def __contains__(self, pseudo):
+        return normalize(pseudo) in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def digest(self):
+        """Empreinte des PP et des alias (pour render_manifest)."""
+        payload = {"files": {n: e["sha256"] for n, e in sorted(self.files.items())},
+                   "aliases": dict(sorted(self.aliases.items()))}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=4)
+def _registry(stamps, aliases_stamp):
+    previous = _load_index()
+    files = {}
+    changed = set(previous) != {name for name, _, _ in stamps}
+    for name, mtime_ns, size in stamps:
+        entry = previous.get(name)
+        if entry and entry.get("mtime_ns") == mtime_ns and entry.get("size") == size:
+            files[name] = entry
+            continue
+        profiling.count("avatars_indexed")
+        files[name] = {"mtime_ns": mtime_ns, "size": size, "sha256": _sha256(PP_DIR / name)}
+        changed = True
+    if changed:
+        _save_index(files)
+    return Registry(files, _load_aliases())
+
+
+def current():
+    """Registre à jour (un scandir ; l'index n'est refait que si une PP ou les alias ont changé)."""
+    return _registry(_stamps(), _aliases_stamp())
+
+
+def clear():
+    _registry.cache_clear()
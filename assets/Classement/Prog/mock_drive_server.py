@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Faux serveur API Drive pour tester la lecture conditionnelle hors ligne
+
+Répond à GET /files/<id> comme files.get (champs "version" et "modifiedTime").
+La révision suit l'instantané local passé en argument : modifier le fichier
+revient à modifier la feuille. POST /files/<id> force aussi une nouvelle version.
+
+Exemple :
+    python mock_drive_server.py snapshot.json --port 8765 &
+    DRIVE_API_URL=http://127.0.0.1:8765 CONDITIONAL_FETCH=1 \\
+    SHEET_SOURCE=snapshot.json python render_all.py
+"""
+
+import argparse
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockDrive:
+    def __init__(self, snapshot_path=None):
+        self.snapshot_path = snapshot_path
+        self.bumps = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def metadata(self, file_id):
+        with self.lock:
+            self.requests += 1
+            mtime_ns = 0
+            if self.snapshot_path and os.path.exists(self.snapshot_path):
+                mtime_ns = os.stat(self.snapshot_path).st_mtime_ns
+            modified = datetime.fromtimestamp(mtime_ns / 1e9, tz=timezone.utc)
+            return {
+                "id": file_id,
+                "version": str(mtime_ns // 1000 + self.bumps),
+                "modifiedTime": modified.isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+            }
+
+    def bump(self):
+        with self.lock:
+            self.bumps += 1
+
+
+def make_handler(drive):
+    class Handler(BaseHTTPRequestHandler):
+        def _file_id(self):
+            parts = self.path.split("?", 1)[0].strip("/").split("/")
+            if len(parts) == 2 and parts[0] == "files":
+                return parts[1]
+            return None
+
+        def _send(self, code, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            file_id = self._file_id()
+            if file_id is None:
+                self._send(404, {"error": "not found"})
+                return
+            self._send(200, drive.metadata(file_id))
+
+        def do_POST(self):
+            file_id = self._file_id()
+            if file_id is None:
+                self._send(404, {"error": "not found"})
+                return
+            drive.bump()
+            self._send(200, drive.metadata(file_id))
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+
+def serve(snapshot_path=None, host="127.0.0.1", port=0):
+    """Démarre le serveur dans un thread. Retourne (serveur, MockDrive, url)."""
+    drive = MockDrive(snapshot_path)
+    server = ThreadingHTTPServer((host, port), make_handler(drive))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://{host}:{server.server_address[1]}"
+    return server, drive, url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Faux serveur API Drive (files.get)")
+    parser.add_argument("snapshot", nargs="?", help="instantané dont le mtime sert de révision")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    drive = MockDrive(args.snapshot)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(drive))
+    print(f"🧪 Mock Drive sur http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Mode overlay : le navigateur dessine le texte, pas Pillow
+
+Au lieu de redessiner et réencoder l'image (des Mo de PNG), le tableau est
+écrit en deux fichiers à côté de la sortie :
+
+- <sortie>.svg       : le modèle inchangé en fond, les PP rondes et un <text>
+                       par case, placés avec la géométrie compilée de la spec
+                       (mêmes bandes, mêmes colonnes que le rendu Pillow) ;
+- <sortie>.data.json : les données seules, compactes (quelques centaines
+                       d'octets pour un top 5) :
+
+    {"fields": ["pseudo", "value"], "rows": [["Akiraa", "12"], ...],
+     "avatars": ["overlay-pp/akiraa-112.webp", ...]}
+
+Les PP ne pointent pas vers pp/*.png (jusqu'à 2 Mo chacune) mais vers des
+vignettes WebP à la taille du rond (x OVERLAY_AVATAR_SCALE pour les écrans
+denses), écrites une fois dans OVERLAY_AVATAR_DIR à côté du SVG, tirées de
+l'atlas des PP quand il est à jour.
+
+Le SVG contient les valeurs du moment (il s'affiche tel quel) et, si
+OVERLAY_POLL_S > 0, un petit script qui relit le .data.json toutes les
+OVERLAY_POLL_S secondes et met les cases à jour ; la taille de police est
+réajustée dans le navigateur entre font.min et font.max de la spec. Le script
+ne tourne que si le SVG est ouvert comme document (<object>, <iframe>, ou
+directement), pas dans un <img>.
+
+Les chemins (modèle, vignettes, police) sont relatifs au dossier de sortie.
+OVERLAY_FONT_URL remplace l'URL de la police (vide = fichier de FONT_PATH).
+"""
+
+import json
+import os
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+from PIL import Image
+
+import avatar_atlas
+import encoders
+import leaderboard
+import profiling
+import text_fit
+
+# =================== CONFIG ===================
+
+OVERLAY_POLL_S   = int(os.environ.get("OVERLAY_POLL_S", "60"))
+OVERLAY_FONT_URL = os.environ.get("OVERLAY_FONT_URL", "")
+
+# Vignettes des PP : dossier (relatif au dossier de sortie), échelle, qualité WebP
+OVERLAY_AVATAR_DIR     = os.environ.get("OVERLAY_AVATAR_DIR", "overlay-pp")
+OVERLAY_AVATAR_SCALE   = int(os.environ.get("OVERLAY_AVATAR_SCALE", "2"))
+OVERLAY_AVATAR_QUALITY = int(os.environ.get("OVERLAY_AVATAR_QUALITY", "85"))
+
+# =================================================
+
+SCRIPT = """
+(function () {
+  var svg = document.documentElement;
+  function fit(t) {
+    var max = +t.getAttribute("data-max"), min = +t.getAttribute("data-min");
+    var w = +t.getAttribute("data-w"), size = max;
+    t.setAttribute("font-size", size);
+    var len = t.getComputedTextLength();
+    if (len > w) {
+      size = Math.max(min, Math.floor(size * w / len));
+      t.setAttribute("font-size", size);
+    }
+  }
+  function update(data) {
+    svg.querySelectorAll("text[data-r]").forEach(function (t) {
+      var row = data.rows[+t.getAttribute("data-r")];
+      var value = row ? row[+t.getAttribute("data-c")] : "";
+      if (t.textContent !== value) { t.textContent = value; fit(t); }
+    });
+    svg.querySelectorAll("image[data-r]").forEach(function (im) {
+      var href = (data.avatars || [])[+im.getAttribute("data-r")];
+      im.setAttribute("visibility", href ? "visible" : "hidden");
+      if (href && im.getAttribute("href") !== href) im.setAttribute("href", href);
+    });
+  }
+  function poll() {
+    fetch(svg.getAttribute("data-src"), {cache: "no-cache"})
+      .then(function (r) { return r.json(); })
+      .then(update)
+      .catch(function () {});
+  }
+  setInterval(poll, svg.getAttribute("data-poll") * 1000);
+})();
+"""
+
+
+def overlay_paths(output_path):
+    p = Path(output_path)
+    return p.with_name(p.stem + ".svg"), p.with_name(p.stem + ".data.json")
+
+
+def href(path, out_dir):
+    """Chemin relatif au dossier de sortie, avec des / (URL)."""
+    return Path(os.path.relpath(os.path.abspath(path), os.path.abspath(out_dir))).as_posix()
+
+
+def data(layout, rows, pp_files, out_dir, diameters=()):
+    """Contenu du .data.json : une liste de valeurs affichées par ligne.
+
+    diameters : diamètre du rond de chaque ligne (taille des vignettes).
+    """
+    fields = [col["field"] for col in layout.columns]
+    doc = {
+        "fields": fields,
+        "rows": [[leaderboard.display(getattr(row, f)) for f in fields] for row in rows],
+    }
+    if layout.avatar:
+        doc["avatars"] = [avatar_href(pp_files.get(row.pseudo), d, out_dir) for row, d in zip(rows, diameters)]
+    return doc
+
+
+def thumbnail(pp_file, diameter, out_dir):
+    """Vignette WebP de la PP pour un rond de diameter px ; réécrite seulement si la PP est plus récente."""
+    size = diameter * OVERLAY_AVATAR_SCALE
+    path = Path(out_dir) / OVERLAY_AVATAR_DIR / f"{Path(pp_file).stem}-{size}.webp"
+    try:
+        if path.stat().st_mtime_ns >= os.stat(pp_file).st_mtime_ns:
+            return path
+    except OSError:
+        pass
+
+    im = avatar_atlas.tile(pp_file, size)
+    if im is None:
+        profiling.count("avatars_decoded")
+        with Image.open(pp_file) as f:
+            im = f.convert("RGBA")
+    # Carré déformé comme dans le rendu Pillow ; le rond est fait par le clipPath du SVG
+    im = im.resize((size, size), Image.LANCZOS)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    encoders.write_atomic(path, lambda f: im.save(f, format="WEBP", quality=OVERLAY_AVATAR_QUALITY,
+                                                  method=encoders.WEBP_METHOD))
+    profiling.count("files_written")
+    return path
+
+
+def avatar_href(pp_file, diameter, out_dir):
+    if not pp_file or not diameter or not Path(pp_file).exists():
+        return None
+    return href(thumbnail(pp_file, diameter, out_dir), out_dir)
+
+
+def css_color(rgb):
+    return "#" + "".join(f"{v:02x}" for v in rgb[:3])
+
+
+def svg(layout, doc, size, base_image_path, output_path, font_path, color, shadow):
+    """Document SVG : fond, PP rondes et une case <text> par colonne et par ligne."""
+    W, H = size
+    out_dir = Path(output_path).parent
+    boxes = layout.compile(W, len(doc["rows"]))
+    font_url = OVERLAY_FONT_URL or href(font_path, out_dir)
+    _, data_path = overlay_paths(output_path)
+
+    text_style = f"fill:{css_color(color)}"
+    if shadow:
+        # Contour d'1 px, comme l'ombre du rendu Pillow
+        text_style += f";stroke:{css_color(shadow)};stroke-width:2px;paint-order:stroke;stroke-linejoin:round"
+
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {W} {H}" width="{W}" height="{H}" '
+        f'data-src={quoteattr(data_path.name)} data-poll="{OVERLAY_POLL_S}">',
+        "<defs>",
+        '<clipPath id="round" clipPathUnits="objectBoundingBox"><circle cx=".5" cy=".5" r=".5"/></clipPath>',
+        f"<style>@font-face{{font-family:board;src:url({quoteattr(font_url)})}}"
+        f"text{{font-family:board,sans-serif;dominant-baseline:central;{text_style}}}</style>",
+        "</defs>",
+        f'<image href={quoteattr(href(base_image_path, out_dir))} width="{W}" height="{H}"/>',
+    ]
+    for i, (row, geo) in enumerate(zip(doc["rows"], boxes)):
+        if geo.avatar is not None:
+            x, y, d = geo.avatar
+            pp = doc["avatars"][i]
+            hidden = "" if pp else ' visibility="hidden"'
+            out.append(
+                f'<image data-r="{i}" x="{x}" y="{y}" width="{d}" height="{d}" clip-path="url(#round)" '
+                f'href={quoteattr(pp or "")}{hidden}/>'
+            )
+        for cell in geo.cells:
+            c = doc["fields"].index(cell.field)
+            value = row[c]
+            font = text_fit.fit_font(value, cell.fit_w, cell.fit_h, font_path,
+                                     layout.font_min, layout.font_max, from_origin=layout.from_origin)
+            if cell.align == "left":
+                x, anchor = cell.x, "start"
+            else:
+                x, anchor = cell.x + cell.nudge, "middle"
+            out.append(
+                f'<text data-r="{i}" data-c="{c}" data-w="{cell.fit_w}" data-min="{layout.font_min}" '
+                f'data-max="{layout.font_max}" x="{x:g}" y="{cell.y:g}" text-anchor="{anchor}" '
+                f'font-size="{font.size}">{escape(value)}</text>'
+            )
+    if OVERLAY_POLL_S > 0:
+        out.append(f"<script><![CDATA[{SCRIPT}]]></script>")
+    out.append("</svg>")
+    return "\n".join(out) + "\n"
+
+
+def _write(path, text):
+    payload = text.encode("utf-8")
+    encoders.write_atomic(path, lambda f: f.write(payload))
+    profiling.count("files_written")
+    profiling.count("bytes_written", len(payload))
+    print(f"   {path.suffix[1:]:<14} {len(payload) / 1024:8.1f} Ko  {path}")
+
+
+def write(layout, rows, base_image_path, output_path, font_path, pp_files, color=(255, 255, 255), shadow=None):
+    """Écrit <sortie>.svg et <sortie>.data.json pour les lignes rows."""
+    with profiling.stage("overlay"):
+        with Image.open(base_image_path) as base:
+            size = base.size
+        out_dir = Path(output_path).parent
+        diameters = [geo.avatar[2] if geo.avatar else None for geo in layout.compile(size[0], len(rows))]
+        doc = data(layout, rows, pp_files, out_dir, diameters)
+        svg_path, data_path = overlay_paths(output_path)
+        _write(data_path, json.dumps(doc, ensure_ascii=False, separators=(",", ":")) + "\n")
+        _write(svg_path, svg(layout, doc, size, base_image_path, output_path, font_path, color, shadow))
+    print(f"✅ {layout.label} (overlay) : {svg_path}")
+    return svg_path, data_path
@@ -0,0 +1,118 @@
+"""
+Chronos et compteurs du rendu
+
+    with profiling.stage("fetch"):      temps cumulé par étape (ms) ; un appel
+        ...                             imbriqué dans la même étape compte une fois
+    profiling.count("textbbox")         compteurs (polices chargées, getbbox, ...)
+    profiling.emit(total_ms=...)        une ligne JSON par exécution
+
+Étapes : auth, probe, fetch, parse, atlas, digest, canvas, fit, draw, avatar,
+resize, encode, overlay.
+Compteurs : fonts_loaded, textbbox_calls, avatars_decoded, avatars_from_atlas,
+templates_decoded, files_written, bytes_written, boards_rendered, boards_skipped.
+Avec un pool de rendu (render_all --jobs), chaque process renvoie ses mesures
+au process principal : les temps par étape sont alors la somme des process et
+peuvent dépasser total_ms.
+
+La ligne JSON est écrite sur la sortie standard (logs du workflow) et, si
+PROFILE_LOG est défini, ajoutée à ce fichier (un objet par ligne).
+
+PROFILE=1 lance aussi cProfile sur toute l'exécution ; le .prof est écrit dans
+PROFILE_DIR (à ouvrir avec python -m pstats ou snakeviz).
+"""
+
+import cProfile
+import json
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROFILE     = os.environ.get("PROFILE", "0") == "1"
+PROFILE_DIR = Path(os.environ.get("PROFILE_DIR", "."))
+PROFILE_LOG = os.environ.get("PROFILE_LOG", "")
+
+_stages   = defaultdict(float)
+_depth    = defaultdict(int)
+_counters = defaultdict(int)
+
+
+@contextmanager
+def stage(name):
+    _depth[name] += 1
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _depth[name] -= 1
+        if _depth[name] == 0:
+            _stages[name] += (time.perf_counter() - t0) * 1000
+
+
+def count(name, n=1):
+    _counters[name] += n
+
+
+def reset():
+    _stages.clear()
+    _depth.clear()
+    _counters.clear()
+
+
+def take():
+    """Mesures depuis le dernier reset (puis remise à zéro), pour les renvoyer au process parent."""
+    snap = {"stages": dict(_stages), "counters": dict(_counters)}
+    _stages.clear()
+    _counters.clear()
+    return snap
+
+
+def merge(snap):
+    """Ajoute les mesures d'un process du pool à celles du process courant."""
+    for k, v in snap.get("stages", {}).items():
+        _stages[k] += v
+    for k, v in snap.get("counters", {}).items():
+        _counters[k] += v
+
+
+def summary(**extra):
+    return {
+        "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        **extra,
+        "stages_ms": {k: round(v, 1) for k, v in sorted(_stages.items())},
+        "counters": dict(sorted(_counters.items())),
+    }
+
+
+def emit(**extra):
+    """Écrit la ligne JSON de l'exécution (stdout + PROFILE_LOG) puis remet à zéro."""
+    line = json.dumps(summary(**extra), ensure_ascii=False)
+    print(line)
+    if PROFILE_LOG:
+        try:
+            with open(PROFILE_LOG, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            print("⚠️ PROFILE_LOG non écrit :", e)
+    reset()
+    return line
+
+
+@contextmanager
+def profiled(name="render"):
+    """cProfile autour du bloc si PROFILE=1, sinon rien."""
+    if not PROFILE:
+        yield
+        return
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield
+    finally:
+        prof.disable()
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        path = PROFILE_DIR / f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.prof"
+        prof.dump_stats(path)
+        print("🔬 Profil cProfile :", path)
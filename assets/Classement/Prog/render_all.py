@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Google Sheet -> tous les classements en un seul passage
+
+- Une seule lecture de la feuille "Classement" (ou de l'instantané, voir sheet_source)
+- Lignes typées une seule fois (leaderboard)
+- Tableaux : solo, team, puis chaque top de stat_boards.json (kill, mort,
+  assist... ; un top de plus ne coûte ni script ni lecture de la feuille)
+- Les tableaux sont indépendants : ils sont rendus en parallèle dans un pool
+  de processus (--jobs / RENDER_JOBS, Pillow dessine en tenant le GIL).
+  Chaque process n'écrit que ses propres fichiers ; le manifeste est mis à
+  jour par le process principal, dans l'ordre de BOARDS. --jobs 1 rend tout
+  dans le process courant, comme avant.
+- Les empreintes (render_manifest) sont vérifiées avant tout rendu : seuls
+  les tableaux modifiés partent au pool, et l'atlas des PP n'est construit
+  que si l'un d'eux affiche des PP (un passage sans changement ne décode rien).
+- Une ligne JSON de mesures par exécution (voir profiling)
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+PROG_DIR = Path(__file__).resolve().parent
+
+# Police commune à tous les rendus (avant l'import des scripts qui la lisent)
+os.environ.setdefault("FONT_PATH", str(PROG_DIR / "Oswald-Medium.ttf"))
+
+import avatar_atlas
+import avatar_registry
+import leaderboard
+import profiling
+import render_classement_solo
+import render_classement_team
+import render_manifest
+import sheet_source
+import stat_boards
+
+# =================== CONFIG ===================
+
+SHEET_URL_DEFAULT = "https://docs.google.com/spreadsheets/d/1yp8fKsWip750zB2DWw0af0MfLSTEOYa_uQPZfsqyWEY"
+
+# Dossier des modèles (.png vierges) et dossier de sortie
+TEMPLATE_DIR = Path(os.environ.get("TEMPLATE_DIR", str(PROG_DIR)))
+OUTPUT_DIR   = Path(os.environ.get("OUTPUT_DIR", str(PROG_DIR.parent)))
+
+# Nombre de process de rendu ; 0 = un par tableau, dans la limite des CPU
+RENDER_JOBS = int(os.environ.get("RENDER_JOBS", "0"))
+
+# (module de rendu, nom du fichier de sortie ; modèle du même nom sauf TEMPLATE)
+BOARDS = [
+    (render_classement_solo, "bloc-solo.png"),
+    (render_classement_team, "bloc-team.png"),
+] + [(board, board.OUTPUT) for board in stat_boards.load_boards()]
+
+# =================================================
+
+
+def expected_headers():
+    """Union des en-têtes de tous les tableaux, sans doublons et dans l'ordre."""
+    headers = []
+    for module, _ in BOARDS:
+        for h in module.EXPECTED_HEADERS:
+            if h not in headers:
+                headers.append(h)
+    return headers
+
+
+def fetch_records(sheet_url):
+    return sheet_source.fetch_records(sheet_url, expected_headers())
+
+
+def template_path(module, filename):
+    return TEMPLATE_DIR / getattr(module, "TEMPLATE", filename)
+
+
+def resolve_jobs(jobs):
+    if jobs and jobs > 0:
+        return min(jobs, len(BOARDS))
+    return max(1, min(len(BOARDS), os.cpu_count() or 1))
+
+
+_pool = None
+_pool_jobs = 0
+
+
+def get_pool(jobs):
+    """Pool gardé d'un appel à l'autre (render_daemon : les process restent chauds)."""
+    global _pool, _pool_jobs
+    if _pool is None or _pool_jobs != jobs:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = ProcessPoolExecutor(max_workers=jobs)
+        _pool_jobs = jobs
+    return _pool
+
+
+def reset_pool():
+    """Abandonne un pool cassé (process tué : OOM, SIGKILL) ; le suivant sera neuf."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def render_pooled(tasks, jobs):
+    """Rendu des tâches dans le pool ; un seul nouvel essai si un process du pool est mort."""
+    for attempt in (1, 2):
+        pool = get_pool(jobs)
+        try:
+            futures = [pool.submit(render_one, *task) for task in tasks]
+            return [f.result() for f in futures]
+        except BrokenProcessPool:
+            reset_pool()
+            if attempt == 2:
+                raise
+            print("⚠️ Pool de rendu cassé (process mort), nouvel essai avec un pool neuf")
+
+
+def board_paths(index):
+    module, filename = BOARDS[index]
+    return module, str(template_path(module, filename)), str(OUTPUT_DIR / filename)
+
+
+def render_one(index, rows, checked):
+    """Rendu d'un tableau à redessiner (dans un process du pool).
+
+    Retourne (sortie, empreinte, mesures du rendu pour profiling.merge).
+    """
+    module, base_image_path, output_path = board_paths(index)
+    before = profiling.take()
+    digest = render_manifest.render_board(module, rows, base_image_path, output_path, checked)
+    snap = profiling.take()
+    profiling.merge(before)
+    return output_path, digest, snap
+
+
+def render_all(records, jobs=RENDER_JOBS):
+    """Rend chaque tableau dont les données ont changé. Retourne les sorties réécrites."""
+    # Lignes converties une seule fois, partagées par tous les tableaux
+    with profiling.stage("parse"):
+        board = leaderboard.Leaderboard.from_records(records)
+
+    # Empreintes vérifiées ici : seuls les tableaux modifiés partent au rendu
+    avatar_registry.current()
+    tasks = []
+    for i in range(len(BOARDS)):
+        module, base_image_path, output_path = board_paths(i)
+        rows = module.select_rows(board, module.ROW_COUNT)
+        checked = render_manifest.check_board(module, rows, base_image_path, output_path)
+        if checked is not None:
+            tasks.append((i, rows, checked))
+    if not tasks:
+        return []
+
+    # Atlas des PP construit seulement si un tableau avec PP va être redessiné,
+    # avant que les process du pool ne le lisent
+    if any(getattr(getattr(BOARDS[i][0], "LAYOUT", None), "avatar", None) for i, _, _ in tasks):
+        avatar_atlas.ensure()
+
+    jobs = resolve_jobs(jobs)
+    if jobs == 1 or len(tasks) == 1:
+        results = [render_one(*task) for task in tasks]
+    else:
+        results = render_pooled(tasks, jobs)
+
+    # Manifeste écrit ici seulement, dans l'ordre de BOARDS : même résultat quel que soit jobs
+    written = []
+    for output_path, digest, snap in results:
+        profiling.merge(snap)
+        if digest is not None:
+            render_manifest.record(output_path, digest)
+            written.append(output_path)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rendu de tous les classements")
+    parser.add_argument("--jobs", "-j", type=int, default=RENDER_JOBS,
+                        help="process de rendu en parallèle (0 = auto, 1 = séquentiel)")
+    args = parser.parse_args()
+
+    sheet_url = os.environ.get("SHEET_URL") or SHEET_URL_DEFAULT
+    t0 = time.perf_counter()
+    with profiling.profiled("render_all"):
+        records = fetch_records(sheet_url)
+        written = render_all(records, args.jobs)
+    profiling.emit(
+        run="render_all",
+        jobs=resolve_jobs(args.jobs),
+        written=len(written),
+        total_ms=round((time.perf_counter() - t0) * 1000, 1),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Rendu en continu : un seul process qui surveille la feuille
+
+Au lieu de relancer render_all.py à chaque cron (process neuf, tout est
+rechargé), ce démon garde en mémoire d'un passage à l'autre :
+- le worksheet gspread et la session Drive autorisés (sheet_source, sheet_revision)
+- les modèles décodés (template_cache), les polices (font_cache),
+  les ajustements de texte (text_fit) et les PP rondes (avatar_cache),
+  dans ce process et dans ceux du pool de rendu, gardé entre deux passages
+
+Toutes les POLL_INTERVAL_S secondes, il sonde la révision de la feuille
+(lecture conditionnelle, voir sheet_source) et ne redessine que les tableaux
+dont les lignes ont changé. Les sorties sont écrites de façon atomique
+(fichier temporaire puis os.replace), un lecteur ne voit jamais d'image à moitié écrite.
+
+Exemple :
+    SHEET_URL=... GOOGLE_APPLICATION_CREDENTIALS=service-account.json \\
+    python render_daemon.py --interval 30 --on-change "./publish.sh"
+
+--on-change lance une commande après chaque passage qui a réécrit des
+fichiers (chemins écrits passés en arguments), par exemple pour les publier.
+"""
+
+import argparse
+import os
+import shlex
+import signal
+import subprocess
+import threading
+import time
+from datetime import datetime
+
+import profiling
+import render_all
+
+# =================== CONFIG ===================
+
+POLL_INTERVAL_S = float(os.environ.get("POLL_INTERVAL_S", "60"))
+ON_CHANGE       = os.environ.get("ON_CHANGE", "")
+
+# =================================================
+
+
+def now():
+    return datetime.now().strftime("%H:%M:%S")
+
+
+def run_hook(command, written):
+    try:
+        subprocess.run(shlex.split(command) + written, check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print("⚠️ Commande --on-change en échec :", e)
+
+
+class Daemon:
+    def __init__(self, sheet_url, interval=POLL_INTERVAL_S, on_change=ON_CHANGE, jobs=render_all.RENDER_JOBS):
+        self.sheet_url = sheet_url
+        self.jobs = jobs
+        self.interval = interval
+        self.on_change = on_change
+        self.last_records = None
+        self.stop_event = threading.Event()
+
+    def tick(self):
+        """Un passage : lecture (conditionnelle) puis rendu des tableaux modifiés."""
+        t0 = time.perf_counter()
+        records = render_all.fetch_records(self.sheet_url)
+        if records == self.last_records:
+            profiling.reset()
+            return []
+        written = render_all.render_all(records, self.jobs)
+        self.last_records = records
+        ms = (time.perf_counter() - t0) * 1000
+        print(f"🕒 {now()} : {len(written)} tableau(x) réécrit(s) en {ms:.0f} ms")
+        profiling.emit(run="daemon", written=len(written), total_ms=round(ms, 1))
+        if written and self.on_change:
+            run_hook(self.on_change, written)
+        return written
+
+    def run(self):
+        print(f"👀 Surveillance de la feuille toutes les {self.interval:g} s (Ctrl+C pour arrêter)")
+        while not self.stop_event.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                # Erreur réseau, feuille en cours d'édition... : on réessaie au prochain passage
+                print(f"⚠️ {now()} : passage en échec :", e)
+            self.stop_event.wait(self.interval)
+        print("👋 Arrêt du démon")
+
+    def stop(self, *_):
+        self.stop_event.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rendu continu des classements")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL_S,
+                        help="secondes entre deux lectures de la feuille")
+    parser.add_argument("--on-change", default=ON_CHANGE,
+                        help="commande lancée avec les fichiers réécrits en arguments")
+    parser.add_argument("--jobs", "-j", type=int, default=render_all.RENDER_JOBS,
+                        help="process de rendu en parallèle (0 = auto, 1 = séquentiel)")
+    parser.add_argument("--once", action="store_true", help="un seul passage puis sortie")
+    args = parser.parse_args()
+
+    sheet_url = os.environ.get("SHEET_URL") or render_all.SHEET_URL_DEFAULT
+    daemon = Daemon(sheet_url, args.interval, args.on_change, args.jobs)
+    if args.once:
+        daemon.tick()
+        return
+
+    signal.signal(signal.SIGTERM, daemon.stop)
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        daemon.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Rendu incrémental : on ne redessine un tableau que si ses entrées ont changé
+
+L'empreinte d'un tableau couvre :
+- les lignes envoyées au rendu
+- la config du script (constantes en MAJUSCULES : colonnes, marges, polices, couleurs...)
+- le code du script, l'image modèle, la police, les PP et les formats de sortie
+
+Elle est stockée dans render-manifest.json, à côté des images générées
+(une entrée par fichier de sortie). Si l'empreinte n'a pas bougé, on ne
+dessine ni n'encode rien et le fichier .png reste intact.
+FORCE_RENDER=1 désactive le saut.
+
+Si seules quelques lignes ont changé (même mise en page, mêmes fichiers), on
+repart de l'image précédente : les bandes modifiées sont restaurées depuis le
+modèle puis redessinées. Les lignes du dernier rendu sont gardées dans
+<sortie>.rows.json. INCREMENTAL_RENDER=0 force un rendu complet.
+"""
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image
+
+import avatar_registry
+import encoders
+import profiling
+import template_cache
+
+MANIFEST_NAME = os.environ.get("RENDER_MANIFEST_NAME", "render-manifest.json")
+FORCE_RENDER  = os.environ.get("FORCE_RENDER", "0") == "1"
+INCREMENTAL_RENDER = os.environ.get("INCREMENTAL_RENDER", "1") == "1"
+
+# Constantes qui ne changent pas le rendu (ou qui sont couvertes autrement)
+IGNORED_CONFIG = {
+    "OUTPUT_PATH", "BASE_IMAGE_PATH", "FONT_PATH", "FONT_FILE",
+    "SERVICE_ACCOUNT_FILE", "SHEET_URL_DEFAULT", "WORKSHEET_NAME",
+}
+
+
+@lru_cache(maxsize=None)
+def _file_digest(path, mtime_ns, size):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def file_digest(path):
+    """Empreinte du contenu d'un fichier ("" s'il n'existe pas)."""
+    try:
+        st = os.stat(path)
+    except (OSError, TypeError):
+        return ""
+    return _file_digest(os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+def board_config(module):
+    config = {}
+    for k, v in vars(module).items():
+        if k.isupper() and k not in IGNORED_CONFIG and isinstance(v, (bool, int, float, str)):
+            config[k] = v
+    return config
+
+
+def layout_digest(module, base_image_path):
+    """Empreinte de tout ce qui n'est pas une ligne de données."""
+    layout = getattr(module, "LAYOUT", None)
+    payload = {
+        "config": board_config(module),
+        "code": file_digest(module.__file__),
+        "layout": {
+            "files": [file_digest(p) for p in layout.files()],
+            "settings": layout.settings(),
+        } if layout is not None else None,
+        "template": file_digest(base_image_path),
+        "font": file_digest(getattr(module, "FONT_PATH", None)),
+        "pp": avatar_registry.current().digest() if getattr(layout, "avatar", None) else None,
+        "encoders": encoders.config(),
+    }
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _jsonable(value):
+    if hasattr(value, "as_dict"):
+        return value.as_dict()
+    return str(value)
+
+
+def normalize_rows(rows):
+    """Lignes telles qu'elles seront relues depuis le .rows.json."""
+    return json.loads(json.dumps(rows, ensure_ascii=False, default=_jsonable))
+
+
+def board_digest(module, rows, base_image_path, layout=None):
+    if layout is None:
+        layout = layout_digest(module, base_image_path)
+    blob = json.dumps({"layout": layout, "rows": normalize_rows(rows)}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def manifest_path(output_path):
+    return Path(output_path).with_name(MANIFEST_NAME)
+
+
+def load_manifest(output_path):
+    try:
+        with open(manifest_path(output_path), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def output_files(module, output_path):
+    """Fichiers que le rendu écrit (PNG, ou .svg / .data.json en mode overlay)."""
+    layout = getattr(module, "LAYOUT", None)
+    if layout is not None and hasattr(layout, "outputs"):
+        return layout.outputs(output_path)
+    return [str(output_path)]
+
+
+def is_up_to_date(output_path, digest, files=None):
+    if FORCE_RENDER or not all(Path(p).exists() for p in (files or [output_path])):
+        return False
+    return load_manifest(output_path).get(Path(output_path).name) == digest
+
+
+def record(output_path, digest):
+    path = manifest_path(output_path)
+    manifest = load_manifest(output_path)
+    manifest[Path(output_path).name] = digest
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def rows_path(output_path):
+    p = Path(output_path)
+    return p.with_name(p.stem + ".rows.json")
+
+
+def load_previous_rows(output_path):
+    try:
+        with open(rows_path(output_path), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_rows(output_path, layout, rows):
+    path = rows_path(output_path)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"layout": layout, "rows": normalize_rows(rows)}, f, ensure_ascii=False, indent=1)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def dirty_rows(old_rows, new_rows):
+    """Indices des lignes à redessiner (ajoutées, supprimées ou modifiées)."""
+    new_rows = normalize_rows(new_rows)
+    count = max(len(old_rows), len(new_rows))
+    return [
+        i for i in range(count)
+        if i >= len(old_rows) or i >= len(new_rows) or old_rows[i] != new_rows[i]
+    ]
+
+
+def open_canvas(base_image_path, previous_path=None, dirty=None, band_region=None):
+    """Image de départ d'un rendu.
+
+    Sans dirty : le modèle. Avec dirty : l'image précédente où chaque bande
+    modifiée (band_region(i) -> (haut, bas) en px) est remise à l'état du modèle.
+    """
+    with profiling.stage("canvas"):
+        return _open_canvas(base_image_path, previous_path, dirty, band_region)
+
+
+def _open_canvas(base_image_path, previous_path, dirty, band_region):
+    base = template_cache.open_template(base_image_path)
+    if dirty is None:
+        return base
+    im = Image.open(previous_path).convert("RGBA")
+    if im.size != base.size:
+        raise ValueError(f"{previous_path} : taille {im.size} différente du modèle {base.size}")
+    W = base.size[0]
+    for i in dirty:
+        top, bottom = band_region(i)
+        im.paste(base.crop((0, top, W, bottom)), (0, top))
+    return im
+
+
+def check_board(module, rows, base_image_path, output_path):
+    """(empreinte de mise en page, empreinte) si le tableau doit être rendu, None s'il est à jour."""
+    with profiling.stage("digest"):
+        layout = layout_digest(module, base_image_path)
+        digest = board_digest(module, rows, base_image_path, layout)
+    if is_up_to_date(output_path, digest, output_files(module, output_path)):
+        print("⏭️  Inchangé, rendu ignoré :", output_path)
+        profiling.count("boards_skipped")
+        return None
+    return layout, digest
+
+
+def render_board(module, rows, base_image_path, output_path, checked=None):
+    """Rend le tableau si son empreinte a changé, sans toucher au manifeste.
+
+    Retourne l'empreinte à enregistrer (record), ou None si rien n'a été rendu.
+    checked : résultat de check_board déjà calculé (render_all), sinon calculé ici.
+    Quand la mise en page est la même que lors du dernier rendu, seules les
+    lignes modifiées sont redessinées sur l'image précédente.
+    """
+    if checked is None:
+        checked = check_board(module, rows, base_image_path, output_path)
+        if checked is None:
+            return None
+    layout, digest = checked
+
+    dirty = None
+    previous = load_previous_rows(output_path)
+    if (INCREMENTAL_RENDER and not FORCE_RENDER and previous
+            and previous.get("layout") == layout
+            and Path(output_path).exists()
+            and hasattr(module, "band_region")):
+        dirty = dirty_rows(previous.get("rows", []), rows)
+
+    if dirty is None:
+        module.render(rows, base_image_path, output_path)
+    else:
+        print(f"✏️  {len(dirty)} ligne(s) modifiée(s) :", output_path)
+        module.render(rows, base_image_path, output_path, dirty=dirty)
+    save_rows(output_path, layout, rows)
+    profiling.count("boards_rendered")
+    return digest
+
+
+def render_if_changed(module, rows, base_image_path, output_path):
+    """Appelle module.render(...) seulement si l'empreinte a changé. Retourne True si rendu."""
+    digest = render_board(module, rows, base_image_path, output_path)
+    if digest is None:
+        return False
+    record(output_path, digest)
+    return True
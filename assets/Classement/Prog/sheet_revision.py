@@ -0,0 +1,138 @@
+"""
+Lecture conditionnelle de la feuille : révision Drive + lignes en cache
+
+Avant de télécharger toute la feuille, on demande à l'API Drive sa révision
+(files.get?fields=version,modifiedTime, quelques centaines d'octets). Si elle
+n'a pas bougé depuis la dernière lecture, on réutilise les lignes gardées dans
+SHEET_CACHE_DIR au lieu d'appeler get_all_records.
+
+On y garde aussi la position des colonnes lues (voir sheet_source.read_gspread).
+
+DRIVE_API_URL permet de viser un serveur local (voir mock_drive_server.py) :
+dans ce cas la requête part sans authentification.
+"""
+
+import json
+import os
+import re
+import urllib.request
+from functools import lru_cache
+from pathlib import Path
+
+PROG_DIR = Path(__file__).resolve().parent
+
+DEFAULT_DRIVE_API_URL = "https://www.googleapis.com/drive/v3"
+DRIVE_API_URL   = os.environ.get("DRIVE_API_URL", DEFAULT_DRIVE_API_URL).rstrip("/")
+SHEET_CACHE_DIR = Path(os.environ.get("SHEET_CACHE_DIR", str(PROG_DIR / ".sheet-cache")))
+PROBE_TIMEOUT_S = float(os.environ.get("PROBE_TIMEOUT_S", "10"))
+
+DRIVE_SCOPES = ["https://www.googleapis.com/auth/drive.metadata.readonly"]
+
+STATE_FILE   = "sheet-state.json"
+RECORDS_FILE = "sheet-records.json"
+COLUMNS_FILE = "sheet-columns.json"
+
+
+def spreadsheet_id(sheet_url):
+    m = re.search(r"/spreadsheets/d/([a-zA-Z0-9-_]+)", sheet_url or "")
+    if not m:
+        raise ValueError(f"❌ Identifiant de feuille introuvable dans : {sheet_url}")
+    return m.group(1)
+
+
+@lru_cache(maxsize=None)
+def _session(service_account_file):
+    """Session autorisée gardée pour tout le process (le jeton se renouvelle seul)."""
+    from google.auth.transport.requests import AuthorizedSession
+    from google.oauth2.service_account import Credentials
+
+    creds = Credentials.from_service_account_file(service_account_file, scopes=DRIVE_SCOPES)
+    return AuthorizedSession(creds)
+
+
+def _get_json_authorized(url, service_account_file):
+    resp = _session(service_account_file).get(url, timeout=PROBE_TIMEOUT_S)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def _get_json(url):
+    with urllib.request.urlopen(url, timeout=PROBE_TIMEOUT_S) as resp:
+        return json.load(resp)
+
+
+def probe(sheet_url, service_account_file):
+    """Révision courante de la feuille, ou None si la requête échoue."""
+    url = f"{DRIVE_API_URL}/files/{spreadsheet_id(sheet_url)}?fields=version,modifiedTime"
+    try:
+        if DRIVE_API_URL == DEFAULT_DRIVE_API_URL:
+            meta = _get_json_authorized(url, service_account_file)
+        else:
+            meta = _get_json(url)
+    except Exception as e:
+        print("⚠️ Révision de la feuille indisponible, lecture complète :", e)
+        return None
+    version = meta.get("version")
+    modified = meta.get("modifiedTime")
+    if not version and not modified:
+        return None
+    return f"{version}|{modified}"
+
+
+def load_state():
+    try:
+        with open(SHEET_CACHE_DIR / STATE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def cached_records(sheet_url, revision, expected_headers):
+    """Lignes de la dernière lecture si la révision et les colonnes correspondent."""
+    if not revision:
+        return None
+    state = load_state()
+    if state.get("sheet_url") != sheet_url or state.get("revision") != revision:
+        return None
+    if not set(expected_headers) <= set(state.get("headers", [])):
+        return None
+    try:
+        with open(SHEET_CACHE_DIR / RECORDS_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def save(sheet_url, revision, expected_headers, records):
+    SHEET_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    _write_json(SHEET_CACHE_DIR / RECORDS_FILE, records)
+    _write_json(SHEET_CACHE_DIR / STATE_FILE, {
+        "sheet_url": sheet_url,
+        "revision": revision,
+        "headers": list(expected_headers),
+    })
+
+
+def load_columns(sheet_url, expected_headers):
+    """Position connue des colonnes ({en-tête: lettre}), ou None."""
+    try:
+        with open(SHEET_CACHE_DIR / COLUMNS_FILE, encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    columns = state.get("columns", {})
+    if state.get("sheet_url") != sheet_url or not set(expected_headers) <= set(columns):
+        return None
+    return {h: columns[h] for h in expected_headers}
+
+
+def save_columns(sheet_url, columns):
+    SHEET_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    _write_json(SHEET_CACHE_DIR / COLUMNS_FILE, {"sheet_url": sheet_url, "columns": columns})
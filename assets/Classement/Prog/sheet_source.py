@@ -0,0 +1,261 @@
+"""
+Source des données des classements
+
+SHEET_SOURCE choisit d'où viennent les lignes :
+- "gspread" (défaut) : la Google Sheet, feuille WORKSHEET_NAME (à défaut, la
+  première feuille du classeur) ; seules les colonnes attendues sont lues,
+  en un seul batch_get
+- un fichier .csv ou .json : un instantané local de la feuille
+- "-" ou "stdin" : un flux CSV ou JSON sur l'entrée standard
+
+Si SNAPSHOT_OUT est défini, les lignes récupérées y sont enregistrées
+(.json ou .csv) pour être réutilisées ensuite avec SHEET_SOURCE=<fichier>.
+
+CONDITIONAL_FETCH (voir sheet_revision) :
+- "auto" (défaut) : sonde la révision Drive avant de lire la Google Sheet
+- "1" : sonde aussi pour les autres sources (tests avec mock_drive_server.py)
+- "0" : lecture complète à chaque fois
+
+Dans tous les cas on obtient la même chose que ws.get_all_records() :
+une liste de dicts {en-tête: valeur}, nombres convertis en int / float.
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+import profiling
+import sheet_revision
+
+PROG_DIR = Path(__file__).resolve().parent
+
+SHEET_SOURCE   = os.environ.get("SHEET_SOURCE", "gspread")
+SNAPSHOT_OUT   = os.environ.get("SNAPSHOT_OUT", "")
+CONDITIONAL_FETCH = os.environ.get("CONDITIONAL_FETCH", "auto")
+WORKSHEET_NAME = os.environ.get("WORKSHEET_NAME", "Classement")
+
+SERVICE_ACCOUNT_FILE = (
+    os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
+    or str(PROG_DIR / "service-account.json")
+)
+
+
+def numericise(value):
+    """Même conversion que gspread : "12" -> 12, "1,500.5" -> 1500.5, le reste inchangé."""
+    if not isinstance(value, str) or value == "" or "_" in value:
+        return value
+    cleaned = value.replace(",", "")
+    try:
+        return int(cleaned)
+    except ValueError:
+        pass
+    try:
+        return float(cleaned)
+    except ValueError:
+        return value
+
+
+def column_letter(index):
+    """1 -> "A", 27 -> "AA"."""
+    letters = ""
+    while index > 0:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def check_headers(headers, expected_headers):
+    missing = [h for h in expected_headers if h not in headers]
+    if missing:
+        raise ValueError(f"❌ En-têtes introuvables dans la feuille : {', '.join(missing)}")
+    duplicated = [h for h in expected_headers if headers.count(h) > 1]
+    if duplicated:
+        raise ValueError(f"❌ En-têtes en double dans la feuille : {', '.join(duplicated)}")
+
+
+def records_from_table(table, expected_headers):
+    """Lignes brutes (1re ligne = en-têtes) -> records, comme get_all_records."""
+    if not table:
+        return []
+    headers = [str(h) for h in table[0]]
+    check_headers(headers, expected_headers)
+    records = []
+    for values in table[1:]:
+        values = list(values) + [""] * (len(headers) - len(values))
+        records.append({h: numericise(v) for h, v in zip(headers, values)})
+    return records
+
+
+def records_from_json(data, expected_headers):
+    if isinstance(data, dict):
+        data = data.get("records", [])
+    if data:
+        headers = []
+        for r in data:
+            headers.extend(h for h in r if h not in headers)
+        check_headers(headers, expected_headers)
+    return data
+
+
+# =================== BACKENDS ===================
+
+@lru_cache(maxsize=None)
+def open_worksheet(sheet_url):
+    """Worksheet autorisé, ouvert une fois par process (réutilisé par render_daemon)."""
+    import gspread
+
+    if not sheet_url or "docs.google.com" not in sheet_url:
+        raise SystemExit("❌ SHEET_URL manquante ou invalide.")
+    key_path = Path(SERVICE_ACCOUNT_FILE)
+    if not key_path.exists():
+        raise SystemExit(f"❌ Clé JSON introuvable : {key_path}")
+    with profiling.stage("auth"):
+        gc = gspread.service_account(filename=str(key_path))
+        sh = gc.open_by_url(sheet_url)
+        try:
+            return sh.worksheet(WORKSHEET_NAME)
+        except gspread.WorksheetNotFound:
+            # Comme l'ancien render_classement_team : première feuille du classeur
+            print(f"⚠️ Feuille \"{WORKSHEET_NAME}\" introuvable, lecture de la première feuille")
+            return sh.sheet1
+
+
+def locate_columns(ws, expected_headers):
+    """{en-tête: lettre de colonne}, depuis la ligne d'en-têtes de la feuille."""
+    headers = [str(h) for h in ws.row_values(1)]
+    check_headers(headers, expected_headers)
+    return {h: column_letter(headers.index(h) + 1) for h in expected_headers}
+
+
+def batch_columns(ws, columns):
+    """Un seul batch_get : chaque colonne demandée, en-tête compris."""
+    headers = list(columns)
+    ranges = [f"{columns[h]}1:{columns[h]}" for h in headers]
+    value_ranges = ws.batch_get(ranges, major_dimension="COLUMNS")
+    return {h: (vr[0] if vr else []) for h, vr in zip(headers, value_ranges)}
+
+
+def read_gspread(sheet_url, expected_headers):
+    """Ne lit que les colonnes attendues, en un seul batch_get.
+
+    La position des colonnes est gardée en cache (sheet_revision) et vérifiée
+    avec l'en-tête renvoyé dans le même appel ; si elle a changé, on relit la
+    ligne d'en-têtes puis on recommence.
+    """
+    ws = open_worksheet(sheet_url)
+
+    columns = sheet_revision.load_columns(sheet_url, expected_headers)
+    data = batch_columns(ws, columns) if columns else None
+    if data is None or any(str(data[h][0] if data[h] else "") != h for h in expected_headers):
+        columns = locate_columns(ws, expected_headers)
+        data = batch_columns(ws, columns)
+        sheet_revision.save_columns(sheet_url, columns)
+
+    count = max((len(values) for values in data.values()), default=1) - 1
+    records = []
+    for i in range(1, count + 1):
+        records.append({
+            h: numericise(data[h][i] if i < len(data[h]) else "")
+            for h in expected_headers
+        })
+    return records
+
+
+def read_csv(path, expected_headers):
+    with open(path, newline="", encoding="utf-8") as f:
+        return records_from_table(list(csv.reader(f)), expected_headers)
+
+
+def read_json(path, expected_headers):
+    with open(path, encoding="utf-8") as f:
+        return records_from_json(json.load(f), expected_headers)
+
+
+def read_stdin(expected_headers):
+    text = sys.stdin.read()
+    if text.lstrip()[:1] in ("[", "{"):
+        return records_from_json(json.loads(text), expected_headers)
+    return records_from_table(list(csv.reader(io.StringIO(text))), expected_headers)
+
+
+def source_kind(source=None):
+    source = source or SHEET_SOURCE
+    if source in ("-", "stdin"):
+        return "stdin"
+    if source == "gspread":
+        return "gspread"
+    suffix = Path(source).suffix.lower()
+    if suffix == ".csv":
+        return "csv"
+    if suffix == ".json":
+        return "json"
+    raise ValueError(f"❌ SHEET_SOURCE inconnue : {source}")
+
+
+def write_snapshot(records, path):
+    """Enregistre les lignes en .json (défaut) ou .csv."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    if path.suffix.lower() == ".csv":
+        headers = []
+        for r in records:
+            headers.extend(h for h in r if h not in headers)
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=headers, restval="")
+            writer.writeheader()
+            writer.writerows(records)
+    else:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False, indent=1)
+            f.write("\n")
+    os.replace(tmp, path)
+
+
+def read_source(kind, source, sheet_url, expected_headers):
+    if kind == "gspread":
+        return read_gspread(sheet_url, expected_headers)
+    if kind == "csv":
+        return read_csv(source, expected_headers)
+    if kind == "json":
+        return read_json(source, expected_headers)
+    return read_stdin(expected_headers)
+
+
+def conditional_enabled(kind):
+    if CONDITIONAL_FETCH == "auto":
+        return kind == "gspread"
+    return CONDITIONAL_FETCH == "1"
+
+
+def fetch_records(sheet_url, expected_headers, source=None):
+    """Lit toutes les lignes depuis la source configurée (voir SHEET_SOURCE).
+
+    Si la révision de la feuille n'a pas changé, renvoie les lignes en cache.
+    """
+    source = source or SHEET_SOURCE
+    kind = source_kind(source)
+
+    revision = None
+    records = None
+    if conditional_enabled(kind):
+        with profiling.stage("probe"):
+            revision = sheet_revision.probe(sheet_url, SERVICE_ACCOUNT_FILE)
+        records = sheet_revision.cached_records(sheet_url, revision, expected_headers)
+        if records is not None:
+            print(f"⏭️  Feuille inchangée (révision {revision}), lignes en cache")
+
+    if records is None:
+        with profiling.stage("fetch"):
+            records = read_source(kind, source, sheet_url, expected_headers)
+        if revision:
+            sheet_revision.save(sheet_url, revision, expected_headers, records)
+
+    if SNAPSHOT_OUT:
+        write_snapshot(records, SNAPSHOT_OUT)
+        print("💾 Instantané enregistré :", SNAPSHOT_OUT)
+    return records
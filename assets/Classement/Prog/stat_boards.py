@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Tops N de stats (kill, mort, assist, KDA, win rate...), décrits dans stat_boards.json
+
+Chaque entrée de stat_boards.json est un tableau ; ils sont tous rendus par
+render_all à partir de la même lecture de la feuille, sans script ni appel
+d'API en plus. Deux sortes de tops :
+
+- classé dans la feuille : "source" donne les colonnes rang / pseudo / valeur
+
+    {"name": "top-kill", "layout": "top-kill",
+     "source": {"rank": "Kill Classement", "pseudo": "Pseudo Kill", "value": "Nb Kill"}}
+
+- calculé depuis le classement solo : "value" est un champ des joueurs
+  (games, win, loose, kill, dead, assist, kda) ou un rapport "a / b"
+
+    {"name": "top-kda", "layout": "top-kill", "template": "top-kill.png",
+     "value": "kda", "sort": "desc", "tie_break": ["-games", "pseudo"],
+     "min": {"games": 3}, "format": "{:.2f}"}
+
+    {"name": "top-winrate", "layout": "top-kill", "template": "top-kill.png",
+     "value": "win / games", "min": {"games": 5}, "format": "{:.0%}"}
+
+Clés :
+- name      : sortie <name>.png ; template : modèle (défaut <name>.png)
+- layout    : layouts/<layout>.json (géométrie, voir board_engine)
+- rows      : N (défaut : "rows" de la spec de mise en page) ; refusé au
+              chargement si la N-ième bande dépasse le bas du modèle
+- sort      : "desc" (défaut) ou "asc"
+- tie_break : champs pour départager les égalités, "-champ" = décroissant
+- shared_rank : true (défaut) = même valeur, même rang (1, 2, 2, 4)
+- min       : valeurs minimales pour apparaître (ex. nombre de games)
+- format    : mise en forme Python de la valeur ("{:.1f}", "{:.0%}"...)
+
+Exemple :
+    python stat_boards.py                 # tous les tops
+    python stat_boards.py top-kill        # un seul
+"""
+
+import argparse
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image
+
+import board_engine
+import leaderboard
+import render_manifest
+import sheet_source
+
+PROG_DIR = Path(__file__).resolve().parent
+
+# =================== CONFIG ===================
+
+STAT_BOARDS = Path(os.environ.get("STAT_BOARDS", str(PROG_DIR / "stat_boards.json")))
+
+SHEET_URL_DEFAULT = "https://docs.google.com/spreadsheets/d/1yp8fKsWip750zB2DWw0af0MfLSTEOYa_uQPZfsqyWEY"
+
+TEMPLATE_DIR = Path(os.environ.get("TEMPLATE_DIR", str(PROG_DIR)))
+OUTPUT_DIR   = Path(os.environ.get("OUTPUT_DIR", str(PROG_DIR.parent)))
+
+# =================================================
+
+PLAYER_FIELDS = [f for f in leaderboard.PlayerRow.__slots__ if f not in ("rank", "pseudo")]
+
+
+def _field(name, spec_name):
+    if name not in PLAYER_FIELDS + ["pseudo"]:
+        raise SystemExit(f"❌ Top {spec_name} : champ \"{name}\" inconnu ({', '.join(PLAYER_FIELDS)})")
+    return name
+
+
+def value_getter(expr, spec_name):
+    """"kda" -> row.kda ; "win / games" -> row.win / row.games (None si incalculable)."""
+    parts = [p.strip() for p in str(expr).split("/")]
+    if len(parts) == 1:
+        field = _field(parts[0], spec_name)
+        return lambda row: leaderboard.number(getattr(row, field))
+    if len(parts) == 2:
+        num, den = (_field(p, spec_name) for p in parts)
+
+        def ratio(row):
+            a, b = leaderboard.number(getattr(row, num)), leaderboard.number(getattr(row, den))
+            if a is None or not b:
+                return None
+            return a / b
+        return ratio
+    raise SystemExit(f"❌ Top {spec_name} : valeur \"{expr}\" invalide (champ ou \"a / b\")")
+
+
+def rank_players(players, value, descending=True, tie_break=(), minimum=None, fmt=None, shared_rank=True):
+    """Top calculé : StatRow classés par valeur, égalités départagées par tie_break."""
+    items = []
+    for p in players:
+        if minimum and any((leaderboard.number(getattr(p, k)) or 0) < v for k, v in minimum.items()):
+            continue
+        v = value(p)
+        if v is not None:
+            items.append((p, v))
+
+    # Tris stables, du dernier critère au premier ; valeurs absentes en dernier
+    for key in reversed(tie_break):
+        field, reverse = (key[1:], True) if key.startswith("-") else (key, False)
+        def key_of(it, field=field):
+            value = getattr(it[0], field)
+            return value if field == "pseudo" else leaderboard.number(value)
+        known = [it for it in items if key_of(it) is not None]
+        known.sort(key=key_of, reverse=reverse)
+        items = known + [it for it in items if key_of(it) is None]
+    items.sort(key=lambda it: it[1], reverse=descending)
+
+    rows = []
+    for i, (p, v) in enumerate(items):
+        if shared_rank and rows and items[i - 1][1] == v:
+            rank = rows[-1].rank
+        else:
+            rank = i + 1
+        rows.append(leaderboard.StatRow(rank, p.pseudo, fmt.format(v) if fmt else v))
+    return rows
+
+
+class StatBoard:
+    """Un top N ; même interface que les scripts render_* (render_all, render_manifest)."""
+
+    # Code du moteur, pour l'empreinte du rendu (render_manifest)
+    __file__ = __file__
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.NAME = spec["name"]
+        self.STAT = json.dumps(spec, sort_keys=True, ensure_ascii=False)
+        self.OUTPUT = spec.get("output", f"{self.NAME}.png")
+        self.TEMPLATE = spec.get("template", self.OUTPUT)
+        self.LAYOUT = board_engine.load_layout(spec.get("layout", self.NAME))
+        self.ROW_COUNT = int(spec.get("rows", self.LAYOUT.row_count))
+        self._check_rows()
+
+        self.source = spec.get("source")
+        if self.source:
+            self.EXPECTED_HEADERS = [self.source["rank"], self.source["pseudo"], self.source["value"]]
+        else:
+            if "value" not in spec:
+                raise SystemExit(f"❌ Top {self.NAME} : \"source\" ou \"value\" manquant")
+            self.EXPECTED_HEADERS = list(leaderboard.PLAYER_HEADERS)
+            self.value = value_getter(spec["value"], self.NAME)
+            self.descending = spec.get("sort", "desc") != "asc"
+            self.tie_break = spec.get("tie_break", [])
+            for key in self.tie_break:
+                _field(key.lstrip("-"), self.NAME)
+            self.minimum = {_field(k, self.NAME): v for k, v in spec.get("min", {}).items()}
+            self.fmt = spec.get("format")
+            self.shared_rank = spec.get("shared_rank", True)
+
+    def _check_rows(self):
+        """Refuse un "rows" qui dessinerait sous le bas de l'image modèle."""
+        template = TEMPLATE_DIR / self.TEMPLATE
+        try:
+            with Image.open(template) as im:
+                height = im.size[1]
+        except OSError as e:
+            raise SystemExit(f"❌ Top {self.NAME} : image modèle illisible : {template} ({e})")
+        fit = self.LAYOUT.max_rows(height)
+        if not 0 < self.ROW_COUNT <= fit:
+            raise SystemExit(f"❌ Top {self.NAME} : {self.ROW_COUNT} lignes demandées, le modèle "
+                             f"{self.TEMPLATE} ({height} px de haut) en tient {fit} au plus")
+
+    def __repr__(self):
+        return f"StatBoard({self.NAME})"
+
+    def band_region(self, i):
+        """Bande (haut, bas) en px occupée par la ligne i, jusqu'à la ligne suivante."""
+        return self.LAYOUT.band_region(i)
+
+    def select_rows(self, board, row_count):
+        """Les row_count premières lignes du top (StatRow)."""
+        if self.source:
+            s = self.source
+            return leaderboard.parse_stat(board.records, s["rank"], s["pseudo"], s["value"])[:row_count]
+        return rank_players(board.players, self.value, self.descending, self.tie_break,
+                            self.minimum, self.fmt, self.shared_rank)[:row_count]
+
+    def render(self, rows, base_image_path, output_path, dirty=None):
+        # dirty : indices des lignes à redessiner sur l'image précédente (None = tout)
+        board_engine.render(self.LAYOUT, rows, base_image_path, output_path, dirty)
+
+
+@lru_cache(maxsize=None)
+def load_boards():
+    """Tops de stat_boards.json, dans l'ordre du fichier."""
+    try:
+        with open(STAT_BOARDS, encoding="utf-8") as f:
+            specs = json.load(f)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"❌ Définition des tops illisible : {STAT_BOARDS} ({e})")
+    names = [s.get("name") for s in specs]
+    if None in names or len(set(names)) != len(names):
+        raise SystemExit(f"❌ {STAT_BOARDS} : chaque top doit avoir un \"name\" unique")
+    return tuple(StatBoard(s) for s in specs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tops N de stats (stat_boards.json)")
+    parser.add_argument("names", nargs="*", help="tops à rendre (défaut : tous)")
+    args = parser.parse_args()
+
+    boards = [b for b in load_boards() if not args.names or b.NAME in args.names]
+    if not boards:
+        raise SystemExit(f"❌ Aucun top nommé {', '.join(args.names)} dans {STAT_BOARDS}")
+
+    headers = []
+    for b in boards:
+        headers += [h for h in b.EXPECTED_HEADERS if h not in headers]
+    sheet_url = os.environ.get("SHEET_URL") or SHEET_URL_DEFAULT
+    board = leaderboard.Leaderboard.from_records(sheet_source.fetch_records(sheet_url, headers))
+
+    for b in boards:
+        rows = b.select_rows(board, b.ROW_COUNT)
+        render_manifest.render_if_changed(b, rows, str(TEMPLATE_DIR / b.TEMPLATE), str(OUTPUT_DIR / b.OUTPUT))
+
+
+if __name__ == "__main__":
+    main()
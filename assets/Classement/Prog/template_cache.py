@@ -0,0 +1,142 @@
+"""
+Cache des modèles décodés (bloc-solo.png, top-kill.png, ...)
+
+Chaque modèle PNG est décodé une seule fois en pixels RGBA bruts, enregistrés
+dans TEMPLATE_CACHE_DIR sous forme de fichier .rgba :
+
+    en-tête (64 octets) : magic | largeur | hauteur | mtime_ns | taille | sha256
+    puis largeur * hauteur * 4 octets RGBA
+
+Le fichier est relu par mmap et l'image Pillow pointe directement sur la
+mémoire projetée (Image.frombuffer, aucune copie). L'image est en lecture
+seule : Pillow n'en fait une copie qu'au premier dessin, et un simple crop
+(rendu incrémental) ne copie rien du tout.
+
+Le cache est valide si le mtime et la taille du modèle n'ont pas bougé ; sinon
+on compare le sha256 (un checkout git change le mtime sans changer le fichier).
+
+TEMPLATE_CACHE=0 désactive le cache (décodage PNG à chaque fois).
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image
+
+import profiling
+
+PROG_DIR = Path(__file__).resolve().parent
+
+TEMPLATE_CACHE     = os.environ.get("TEMPLATE_CACHE", "1") == "1"
+TEMPLATE_CACHE_DIR = Path(os.environ.get("TEMPLATE_CACHE_DIR", str(PROG_DIR / ".template-cache")))
+
+MAGIC  = b"RGBA\x00\x01\r\n"
+HEADER = struct.Struct("<8sIIQQ32s")
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.digest()
+
+
+def cache_path(path):
+    key = hashlib.sha1(str(path).encode("utf-8")).hexdigest()[:10]
+    return TEMPLATE_CACHE_DIR / f"{Path(path).stem}.{key}.rgba"
+
+
+def _read_header(cached):
+    try:
+        with open(cached, "rb") as f:
+            raw = f.read(HEADER.size)
+    except OSError:
+        return None
+    if len(raw) != HEADER.size:
+        return None
+    magic, w, h, mtime_ns, size, digest = HEADER.unpack(raw)
+    if magic != MAGIC or os.path.getsize(cached) != HEADER.size + w * h * 4:
+        return None
+    return w, h, mtime_ns, size, digest
+
+
+def _write(cached, im, mtime_ns, size, digest):
+    cached.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cached.with_name(cached.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, im.size[0], im.size[1], mtime_ns, size, digest))
+        f.write(im.tobytes("raw", "RGBA"))
+    os.replace(tmp, cached)
+
+
+def _touch_header(cached, header, mtime_ns):
+    """Même contenu, nouveau mtime : on met juste l'en-tête à jour."""
+    w, h, _, size, digest = header
+    with open(cached, "r+b") as f:
+        f.write(HEADER.pack(MAGIC, w, h, mtime_ns, size, digest))
+
+
+def _map(cached, w, h):
+    with open(cached, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return (w, h), memoryview(mm)[HEADER.size:]
+
+
+def _decode(path):
+    profiling.count("templates_decoded")
+    with Image.open(path) as f:
+        return f.convert("RGBA")
+
+
+@lru_cache(maxsize=None)
+def _template(path, mtime_ns, size):
+    """((largeur, hauteur), buffer RGBA) ; le buffer garde le mmap ouvert."""
+    if not TEMPLATE_CACHE:
+        im = _decode(path)
+        return im.size, im.tobytes("raw", "RGBA")
+
+    cached = cache_path(path)
+    header = _read_header(cached)
+    if header and header[2:4] == (mtime_ns, size):
+        return _map(cached, *header[:2])
+
+    digest = _sha256(path)
+    if header and header[3:] == (size, digest):
+        try:
+            _touch_header(cached, header, mtime_ns)
+        except OSError:
+            pass
+        return _map(cached, *header[:2])
+
+    im = _decode(path)
+    try:
+        _write(cached, im, mtime_ns, size, digest)
+    except OSError as e:
+        print("⚠️ Cache du modèle non écrit :", e)
+        return im.size, im.tobytes("raw", "RGBA")
+    return _map(cached, *im.size)
+
+
+def open_template(base_image_path):
+    """Modèle en RGBA, en lecture seule (Pillow le copie au premier dessin).
+
+    Chaque appel renvoie une nouvelle image sur le même buffer : dessiner sur
+    l'une ne touche ni le cache ni les autres.
+    """
+    path = os.path.abspath(base_image_path)
+    st = os.stat(path)
+    size, buf = _template(path, st.st_mtime_ns, st.st_size)
+    return Image.frombuffer("RGBA", size, buf, "raw", "RGBA", 0, 1)
+
+
+def cache_info():
+    return _template.cache_info()
+
+
+def clear():
+    _template.cache_clear()
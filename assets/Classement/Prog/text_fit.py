@@ -0,0 +1,71 @@
+"""
+Ajustement de la taille de police dans une case
+
+Au lieu de descendre de 1 pt à chaque essai, on teste d'abord la taille max
+(le cas le plus courant : "0", "12", ...), puis la taille min, puis on fait
+une recherche dichotomique entre les deux. Les résultats sont mémorisés par
+(texte, largeur, hauteur, police) : les mêmes pseudos et petits nombres
+reviennent sur tous les tableaux et ne sont mesurés qu'une fois par process.
+"""
+
+import os
+from functools import lru_cache
+
+import font_cache
+import profiling
+
+FIT_CACHE_SIZE = int(os.environ.get("FIT_CACHE_SIZE", "8192"))
+
+
+@lru_cache(maxsize=FIT_CACHE_SIZE)
+def measure(text, font, from_origin=True):
+    """Taille du texte, équivalente à draw.textbbox((0, 0), text, font=font).
+
+    from_origin=True  -> (droite, bas) de la bbox, comme les scripts solo / top
+    from_origin=False -> (largeur, hauteur) réelles de la bbox, comme le script team
+    """
+    profiling.count("textbbox_calls")
+    x0, y0, x1, y1 = font.getbbox(text)
+    if from_origin:
+        return x1, y1
+    return x1 - x0, y1 - y0
+
+
+@lru_cache(maxsize=FIT_CACHE_SIZE)
+def fit_size(text, max_w, max_h, font_path, size_min, size_max, from_origin=True):
+    """Plus grande taille dans [size_min, size_max] qui tient dans max_w x max_h.
+
+    Retourne size_min si rien ne tient (même comportement que l'ancienne boucle).
+    """
+    def fits(size):
+        w, h = measure(text, font_cache.truetype(font_path, size), from_origin)
+        return w <= max_w and h <= max_h
+
+    if fits(size_max):
+        return size_max
+    if size_min >= size_max or not fits(size_min):
+        return size_min
+
+    # Invariant : lo tient, hi ne tient pas
+    lo, hi = size_min, size_max
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if fits(mid):
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+def fit_font(text, max_w, max_h, font_path, size_min, size_max, from_origin=True):
+    size = fit_size(text, max_w, max_h, font_path, size_min, size_max, from_origin)
+    return font_cache.truetype(font_path, size)
+
+
+def cache_info():
+    return {"measure": measure.cache_info(), "fit_size": fit_size.cache_info()}
+
+
+def clear():
+    measure.cache_clear()
+    fit_size.cache_clear()
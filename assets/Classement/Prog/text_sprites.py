@@ -0,0 +1,106 @@
+"""
+Cache des textes déjà rastérisés
+
+draw.text refait à chaque appel tout le rendu FreeType du texte. Ici le masque
+"L" d'un texte est calculé une seule fois par (texte, police, taille, position
+sous-pixel) puis collé avec la couleur voulue : im.paste(couleur, boîte, masque)
+donne exactement les mêmes pixels que draw.text.
+
+- Le masque ne dépend pas de la couleur : un même sprite sert au texte et à
+  son ombre, et d'un tableau à l'autre (pseudos, petits nombres "0"-"99").
+- L'ombre est tirée du même masque : union du masque décalé de 1 px dans les
+  4 directions (dilatation), fusionnée avec le texte en un seul sprite RGBA
+  puis posée en un seul alpha_composite (au lieu de 5 draw.text par case).
+- Le cache vit dans le process : en mode démon (render_daemon) il est gardé
+  d'un passage à l'autre.
+
+TEXT_SPRITE_CACHE_SIZE règle le nombre de sprites gardés.
+"""
+
+import math
+import os
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+import profiling
+
+TEXT_SPRITE_CACHE_SIZE = int(os.environ.get("TEXT_SPRITE_CACHE_SIZE", "8192"))
+
+# Contour d'1 px autour du texte
+SHADOW_OFFSETS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+@lru_cache(maxsize=TEXT_SPRITE_CACHE_SIZE)
+def sprite(text, font, start):
+    """(masque "L", décalage) du texte ; start = partie fractionnaire de (x, y), comme draw.text."""
+    profiling.count("text_rasterized")
+    mask, offset = font.getmask2(text, "L", start=start)
+    # getmask2 renvoie un objet interne de Pillow : copié dans une Image par l'API
+    # publique (une fois par sprite, le cache fait le reste ; testé avec Pillow 12.3)
+    return Image.frombuffer("L", mask.size, bytes(mask), "raw", "L", 0, 1), offset
+
+
+@lru_cache(maxsize=TEXT_SPRITE_CACHE_SIZE)
+def shadowed_sprite(text, font, start, fill, shadow):
+    """(sprite RGBA, décalage) : texte fill sur son ombre shadow, bord de 1 px compris."""
+    mask, (ox, oy) = sprite(text, font, start)
+    w, h = mask.size
+    m = np.asarray(mask, dtype=np.float32) / 255
+
+    # Couverture du texte et de l'ombre sur le sprite agrandi de 1 px de chaque côté
+    text_a = np.zeros((h + 2, w + 2), np.float32)
+    text_a[1:h + 1, 1:w + 1] = m
+    clear = np.ones_like(text_a)
+    for dx, dy in SHADOW_OFFSETS:
+        clear[1 + dy:h + 1 + dy, 1 + dx:w + 1 + dx] *= 1 - m
+    shadow_a = (1 - clear) * (1 - text_a)
+
+    # Même résultat que l'ombre collée puis le texte par-dessus
+    alpha = text_a + shadow_a
+    rgb = (np.multiply.outer(text_a, np.asarray(fill[:3], np.float32))
+           + np.multiply.outer(shadow_a, np.asarray(shadow[:3], np.float32)))
+    rgb /= np.maximum(alpha, 1e-6)[..., None]
+    rgba = np.dstack([rgb, alpha * 255])
+    rgba = np.clip(np.rint(rgba), 0, 255).astype(np.uint8)
+    return Image.fromarray(rgba), (ox - 1, oy - 1)
+
+
+def paste_text(im, xy, text, font, fill, shadow=None):
+    """Colle le texte en xy (même position que draw.text), avec son ombre si shadow = couleur."""
+    if not text:
+        return
+    if "\n" in text or not isinstance(font, ImageFont.FreeTypeFont):
+        draw = ImageDraw.Draw(im)
+        if shadow is not None:
+            for dx, dy in SHADOW_OFFSETS:
+                draw.text((xy[0] + dx, xy[1] + dy), text, font=font, fill=shadow)
+        draw.text(xy, text, font=font, fill=fill)
+        return
+
+    x, y = xy
+    start = (math.modf(x)[0], math.modf(y)[0])
+    if shadow is not None and im.mode == "RGBA":
+        rgba, (ox, oy) = shadowed_sprite(text, font, start, tuple(fill), tuple(shadow))
+        px, py = int(x) + ox, int(y) + oy
+        if px >= 0 and py >= 0:
+            im.alpha_composite(rgba, (px, py))
+            return
+
+    mask, (ox, oy) = sprite(text, font, start)
+    w, h = mask.size
+    layers = [(dx, dy, shadow) for dx, dy in SHADOW_OFFSETS] if shadow is not None else []
+    for dx, dy, color in layers + [(0, 0, fill)]:
+        px = int(x + dx) + ox
+        py = int(y + dy) + oy
+        im.paste(color, (px, py, px + w, py + h), mask)
+
+
+def cache_info():
+    return sprite.cache_info()
+
+
+def clear():
+    sprite.cache_clear()
+    shadowed_sprite.cache_clear()